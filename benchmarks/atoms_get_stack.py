@@ -0,0 +1,243 @@
+import logging
+import time
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import click
+import numpy as np
+import pyparsing as pp
+
+from cloud_validol.admin.lib.atoms import grammar
+
+
+def _make_legacy_expression_grammar(
+    allow_unknown_atoms: bool,
+    atom_names: List[str],
+    push: Callable[[grammar.ParsedToken], None],
+):
+    push_first = lambda tokens: push(tokens[0])
+
+    point = pp.Literal('.')
+    lpar = pp.Literal('(')
+    rpar = pp.Literal(')')
+    add_op = pp.oneOf(['+', '-']).setParseAction(
+        lambda tokens: grammar.ParsedToken(
+            type=grammar.TokenType.ARITHMETIC_OPERATION, value=tokens[0]
+        )
+    )
+    mult_op = pp.oneOf(['*', '/']).setParseAction(
+        lambda tokens: grammar.ParsedToken(
+            type=grammar.TokenType.ARITHMETIC_OPERATION, value=tokens[0]
+        )
+    )
+
+    atom_expressions = [
+        pp.Literal(atom_name) for atom_name in sorted(atom_names, key=lambda x: -len(x))
+    ]
+    if allow_unknown_atoms:
+        atom_expressions.append(grammar.make_atom_grammar())
+
+    timeseries = pp.Or(atom_expressions).setParseAction(
+        lambda tokens: grammar.ParsedToken(type=grammar.TokenType.ATOM, value=tokens[0])
+    )
+    number = pp.Combine(
+        pp.Word(pp.nums) + pp.Optional(point + pp.Optional(pp.Word(pp.nums)))
+    ).setParseAction(
+        lambda tokens: grammar.ParsedToken(
+            type=grammar.TokenType.NUMBER, value=float(tokens[0])
+        )
+    )
+
+    expr = pp.Forward()
+
+    token = (number | timeseries).setParseAction(push_first)
+    atom = token | pp.Group(lpar + expr + rpar)
+    term = atom + pp.ZeroOrMore((mult_op + atom).setParseAction(push_first))
+    expr << term + pp.ZeroOrMore((add_op + term).setParseAction(push_first))
+
+    return expr
+
+
+def _legacy_parse_expression(
+    allow_unknown_atoms: bool, atom_names: List[str], expression: str
+) -> List[grammar.ParsedToken]:
+    stack: List[grammar.ParsedToken] = []
+    expression_grammar = _make_legacy_expression_grammar(
+        allow_unknown_atoms, atom_names, stack.append
+    )
+
+    try:
+        expression_grammar.parseString(expression, parseAll=True)
+    except pp.ParseBaseException as exc:
+        raise grammar.ParseError(str(exc))
+
+    return stack
+
+
+def _get_legacy_nested_stack(
+    library: grammar.ExpressionLibrary, expression: str
+) -> List:
+    atom_names = list(library.user_expressions) + library.basic_atoms
+    stack: List = _legacy_parse_expression(False, atom_names, expression)
+    for index, token in enumerate(stack):
+        if token.type != grammar.TokenType.ATOM:
+            continue
+
+        if token.value in library.basic_atoms:
+            continue
+
+        stack[index] = _get_legacy_nested_stack(
+            library, library.user_expressions[token.value]
+        )
+
+    return stack
+
+
+def _get_legacy_stack(
+    library: grammar.ExpressionLibrary, expression: str
+) -> List[grammar.ParsedToken]:
+    return list(grammar.flatten_list(_get_legacy_nested_stack(library, expression)))
+
+
+def _get_stack(
+    library: grammar.ExpressionLibrary, expression: str
+) -> List[grammar.ParsedToken]:
+    return grammar.get_stack(
+        allow_unknown_atoms=False, expression=expression, library=library
+    )
+
+
+def _make_user_expressions(
+    rng: np.random.Generator, atoms: int, basic_atoms: List[str]
+) -> Dict[str, str]:
+    user_expressions: Dict[str, str] = {}
+    for x in range(atoms):
+        # user atoms are made of basic atoms, numbers and previous user atoms
+        operands = []
+        for _ in range(rng.integers(2, 5)):
+            if user_expressions and rng.random() < 0.3:
+                operands.append(str(rng.choice(list(user_expressions))))
+            elif rng.random() < 0.2:
+                operands.append(f'{rng.integers(1, 100)}.{rng.integers(0, 10)}')
+            else:
+                operands.append(str(rng.choice(basic_atoms)))
+
+        expression = operands[0]
+        for operand in operands[1:]:
+            expression = f'{expression} {rng.choice(["+", "-", "*", "/"])} {operand}'
+            if rng.random() < 0.3:
+                expression = f'({expression})'
+
+        user_expressions[f'user_atom_{x}'] = expression
+
+    return user_expressions
+
+
+def _make_datasets_basic_atoms(
+    rng: np.random.Generator, datasets: int, basic_atoms: List[str]
+) -> List[List[str]]:
+    # datasets have some of the basic atoms, so some user atoms aren't available
+    return [
+        sorted(rng.choice(basic_atoms, len(basic_atoms) * 3 // 4, replace=False))
+        for _ in range(datasets)
+    ]
+
+
+def _measure(
+    get_stack: Callable[[grammar.ExpressionLibrary, str], List[grammar.ParsedToken]],
+    user_expressions: Dict[str, str],
+    datasets_basic_atoms: List[List[str]],
+):
+    # what atoms_get does for every dataset
+    start = time.perf_counter()
+    results = []
+    for basic_atoms in datasets_basic_atoms:
+        library = grammar.ExpressionLibrary(
+            user_expressions=user_expressions, basic_atoms=basic_atoms
+        )
+        for expression in user_expressions.values():
+            rendered_stack: Optional[str]
+            try:
+                rendered_stack = grammar.render_stack(get_stack(library, expression))
+            except grammar.ParseError:
+                rendered_stack = None
+            results.append(rendered_stack)
+
+    return results, (time.perf_counter() - start) / len(datasets_basic_atoms)
+
+
+def _measure_resolved(
+    user_expressions: Dict[str, str], datasets_basic_atoms: List[List[str]]
+):
+    # what atoms_get does once per request and then for every dataset
+    start = time.perf_counter()
+    library = grammar.ExpressionLibrary(
+        user_expressions=user_expressions,
+        basic_atoms=sorted(set().union(*datasets_basic_atoms)),
+    )
+    resolved_atoms = grammar.resolve_user_expressions(library)
+    rendered_stacks = {
+        atom: grammar.render_stack(resolved_atom.stack)
+        for atom, resolved_atom in resolved_atoms.items()
+    }
+
+    results = []
+    for basic_atoms in datasets_basic_atoms:
+        basic_atom_names = set(basic_atoms)
+        for atom in user_expressions:
+            resolved_atom = resolved_atoms.get(atom)
+            if (
+                resolved_atom is None
+                or not resolved_atom.basic_atoms <= basic_atom_names
+            ):
+                results.append(None)
+            else:
+                results.append(rendered_stacks[atom])
+
+    return results, (time.perf_counter() - start) / len(datasets_basic_atoms)
+
+
+@click.command()
+@click.option('--atoms', default=1000, show_default=True)
+@click.option('--datasets', default=50, show_default=True)
+@click.option('--basic-atoms', default=40, show_default=True)
+@click.option(
+    '--legacy-datasets',
+    default=2,
+    show_default=True,
+    help='Datasets to run the legacy parser on, it takes seconds per dataset',
+)
+def main(atoms, datasets, basic_atoms, legacy_datasets):
+    # atoms unavailable for a dataset are logged as parse errors
+    logging.disable(logging.ERROR)
+
+    rng = np.random.default_rng(0)
+    basic_atom_names = [f'basic_{x}' for x in range(basic_atoms)]
+    user_expressions = _make_user_expressions(rng, atoms, basic_atom_names)
+    datasets_basic_atoms = _make_datasets_basic_atoms(rng, datasets, basic_atom_names)
+
+    legacy_results, legacy_time = _measure(
+        _get_legacy_stack, user_expressions, datasets_basic_atoms[:legacy_datasets]
+    )
+    results, cold_time = _measure(_get_stack, user_expressions, datasets_basic_atoms)
+    _, warm_time = _measure(_get_stack, user_expressions, datasets_basic_atoms)
+    resolved_results, resolved_time = _measure_resolved(
+        user_expressions, datasets_basic_atoms
+    )
+
+    assert legacy_results == results[: len(legacy_results)]
+    assert resolved_results == results
+
+    print(
+        f'{atoms} atoms x {datasets} datasets, per dataset: '
+        f'legacy: {legacy_time * 1000:.0f}ms, '
+        f'compiled: {cold_time * 1000:.1f}ms, '
+        f'memoized: {warm_time * 1000:.1f}ms, '
+        f'resolved once: {resolved_time * 1000:.1f}ms'
+    )
+
+
+if __name__ == '__main__':
+    main()
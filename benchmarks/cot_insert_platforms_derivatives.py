@@ -0,0 +1,189 @@
+import os
+import shutil
+import time
+from typing import Callable
+
+import click
+import numpy as np
+import pandas as pd
+import psycopg2
+
+from cloud_validol.lib import secdist
+from cloud_validol.loader.lib import cot
+from cloud_validol.loader.lib import pg
+from cloud_validol.loader.reports import cftc
+
+import loader_services
+
+DBNAME = 'validol_benchmark'
+
+
+def _legacy_insert_platforms_derivatives(
+    conn: psycopg2.extensions.connection, config: cot.DerivativeConfig, df: pd.DataFrame
+):
+    derivatives = set()
+    platforms = {}
+    for _, row in df.iterrows():
+        derivatives.add((row.platform_code, row.derivative_name))
+        platforms[row.platform_code] = row.platform_name
+
+    platform_codes, platform_names = zip(*platforms.items())
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            '''
+            INSERT INTO validol_internal.cot_derivatives_platform (source, code, name)
+            SELECT %s, UNNEST(%s), UNNEST(%s)
+            ON CONFLICT (source, code) DO UPDATE SET
+                name = EXCLUDED.name
+            RETURNING id
+        ''',
+            (config.source, list(platform_codes), list(platform_names)),
+        )
+        platform_ids = dict(zip(platform_codes, pg.extract_ids_from_cursor(cursor)))
+
+        derivative_platform_ids, derivative_names = zip(
+            *[
+                (platform_ids[platform_code], derivative_name)
+                for platform_code, derivative_name in derivatives
+            ]
+        )
+        cursor.execute(
+            '''
+            INSERT INTO validol_internal.cot_derivatives_info (cot_derivatives_platform_id, name, report_type)
+            SELECT UNNEST(%s), UNNEST(%s), %s
+            ON CONFLICT (cot_derivatives_platform_id, name, report_type) DO UPDATE SET
+                name = EXCLUDED.name
+            RETURNING id
+        ''',
+            (list(derivative_platform_ids), list(derivative_names), config.report_type),
+        )
+
+        derivative_ids = dict(zip(derivatives, pg.extract_ids_from_cursor(cursor)))
+
+    conn.commit()
+
+    df['series_id'] = [
+        derivative_ids[row.platform_code, row.derivative_name]
+        for _, row in df.iterrows()
+    ]
+
+
+def _make_df(config: cot.DerivativeConfig, rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    derivative_ids = rng.integers(0, 1000, rows)
+
+    raw_df = pd.DataFrame(
+        {
+            config.platform_code_col: [f'{x % 300:06d} ' for x in derivative_ids],
+            # platforms get renamed, the last name of a code is the one stored
+            config.derivative_name_col: [
+                f'DERIVATIVE-{x} - EXCHANGE {x % 300} V{y}'
+                for x, y in zip(derivative_ids, rng.integers(0, 2, rows))
+            ],
+            config.date_col: pd.Timestamp('2020-01-07').strftime(config.date_format),
+        }
+    )
+    for column in config.data_cols:
+        raw_df[column] = 0
+
+    # the way cftc reads the reports
+    df = cot.process_raw_dataframe(
+        config, config.date_format, raw_df.astype(cot.get_dtypes(config))
+    )
+
+    # subsets keep all of the categories, the way ice splits its reports
+    return df[df.platform_code.isin(df.platform_code.cat.categories[::2])]
+
+
+def _read_stored(conn: psycopg2.extensions.connection) -> pd.DataFrame:
+    with conn.cursor() as cursor:
+        cursor.execute(
+            '''
+            SELECT
+                info.id AS series_id,
+                platform.code,
+                platform.name AS platform_name,
+                info.name AS derivative_name
+            FROM validol_internal.cot_derivatives_info AS info
+            JOIN validol_internal.cot_derivatives_platform AS platform
+                ON platform.id = info.cot_derivatives_platform_id
+            ORDER BY info.id
+        '''
+        )
+
+        return pd.DataFrame(
+            cursor.fetchall(),
+            columns=['series_id', 'code', 'platform_name', 'derivative_name'],
+        )
+
+
+def _measure(
+    insert: Callable[
+        [psycopg2.extensions.connection, cot.DerivativeConfig, pd.DataFrame], None
+    ],
+    conn: psycopg2.extensions.connection,
+    config: cot.DerivativeConfig,
+    df: pd.DataFrame,
+):
+    start = time.perf_counter()
+    insert(conn, config, df)
+
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option('--rows', default=100000, show_default=True)
+@click.option(
+    '--pg-bin',
+    default=lambda: os.path.dirname(shutil.which('initdb') or ''),
+    help='Directory with initdb and pg_ctl of the disposable Postgres',
+)
+def main(rows, pg_bin):
+    if os.path.isfile(secdist.SECDIST_PATH):
+        raise click.ClickException(
+            f'{secdist.SECDIST_PATH} would point the benchmark at a real database'
+        )
+
+    config = next(
+        config
+        for config in cftc._make_derivative_configs()
+        if config.source == 'cftc_disaggregated_futures_only'
+    )
+    df = _make_df(config, rows)
+
+    with loader_services.disposable_postgres(pg_bin) as postgres:
+        for first, second in [
+            (_legacy_insert_platforms_derivatives, cot.insert_platforms_derivatives),
+            (cot.insert_platforms_derivatives, _legacy_insert_platforms_derivatives),
+        ]:
+            postgres.recreate_database(DBNAME)
+            os.environ.update(postgres.get_env(DBNAME))
+
+            first_df = df.copy()
+            second_df = df.copy()
+            conn = pg.get_connection()
+            try:
+                first_time = _measure(first, conn, config, first_df)
+                first_stored = _read_stored(conn)
+                # the second run upserts the same keys, so it must get the same ids
+                second_time = _measure(second, conn, config, second_df)
+                second_stored = _read_stored(conn)
+            finally:
+                conn.close()
+
+            assert first_df.series_id.dtype == second_df.series_id.dtype == np.int64
+            np.testing.assert_array_equal(first_df.series_id, second_df.series_id)
+            pd.testing.assert_frame_equal(first_stored, second_stored)
+            assert first_stored.series_id.nunique() == len(
+                df[['platform_code', 'derivative_name']].drop_duplicates()
+            )
+
+            print(
+                f'{first.__name__}: {first_time:.2f}s into an empty database, '
+                f'{second.__name__}: {second_time:.2f}s when all keys exist'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+import datetime as dt
+import time
+
+import click
+import numpy as np
+import pandas as pd
+import pytz
+
+from cloud_validol.loader.lib import cot
+from cloud_validol.loader.reports import cftc
+
+
+def _legacy_process_raw_dataframe(
+    config: cot.DerivativeConfig,
+    date_format: str,
+    raw_df: pd.DataFrame,
+) -> pd.DataFrame:
+    usecols = [
+        config.platform_code_col,
+        config.derivative_name_col,
+        config.date_col,
+    ] + list(config.data_cols)
+    raw_df = raw_df[usecols]
+
+    raw_df = raw_df.assign(
+        **{
+            config.date_col: raw_df[config.date_col].map(
+                lambda x: dt.datetime.strptime(x, date_format).replace(tzinfo=pytz.UTC)
+            )
+        }
+    )
+
+    raw_df = raw_df.rename(
+        columns={
+            **config.data_cols,
+            **{
+                config.platform_code_col: 'platform_code',
+                config.date_col: 'event_dttm',
+            },
+        }
+    )
+
+    raw_df.platform_code = [x.strip() for x in raw_df.platform_code]
+
+    platform_names = []
+    derivative_names = []
+    for derivative_dash_platform in raw_df[config.derivative_name_col]:
+        derivative_name, platform_name = derivative_dash_platform.rsplit('-', 1)
+        platform_names.append(platform_name.strip())
+        derivative_names.append(derivative_name.strip())
+
+    raw_df['platform_name'] = platform_names
+    raw_df['derivative_name'] = derivative_names
+
+    del raw_df[config.derivative_name_col]
+
+    return raw_df
+
+
+def _make_raw_df(config: cot.DerivativeConfig, rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    derivative_ids = rng.integers(0, 1000, rows)
+    dates = pd.date_range('2006-01-03', periods=rows // 1000 + 1, freq='7D')
+
+    raw_df = pd.DataFrame(
+        {
+            config.platform_code_col: [f'{x:06d} ' for x in derivative_ids],
+            config.derivative_name_col: [
+                f'DERIVATIVE-{x} - EXCHANGE {x % 7}' for x in derivative_ids
+            ],
+            config.date_col: dates[np.arange(rows) // 1000].strftime(
+                config.date_format
+            ),
+        }
+    )
+    for column in config.data_cols:
+        raw_df[column] = rng.integers(0, 10**6, rows)
+
+    return raw_df
+
+
+def _measure(process, config: cot.DerivativeConfig, raw_df: pd.DataFrame):
+    start = time.perf_counter()
+    df = process(config, config.date_format, raw_df)
+
+    return df, time.perf_counter() - start
+
+
+@click.command()
+@click.option('--rows', default=500000, show_default=True)
+def main(rows):
+    config = next(
+        config
+        for config in cftc._make_derivative_configs()
+        if config.source == 'cftc_disaggregated_futures_only'
+    )
+    raw_df = _make_raw_df(config, rows)
+
+    legacy_df, legacy_time = _measure(_legacy_process_raw_dataframe, config, raw_df)
+    # the way cftc reads the reports
+    df, vectorized_time = _measure(
+        cot.process_raw_dataframe, config, raw_df.astype(cot.get_dtypes(config))
+    )
+
+    pd.testing.assert_frame_equal(legacy_df, df.astype(legacy_df.dtypes.to_dict()))
+
+    legacy_memory = legacy_df.memory_usage(deep=True).sum()
+    memory = df.memory_usage(deep=True).sum()
+    print(f'legacy: {legacy_time:.2f}s, vectorized: {vectorized_time:.2f}s')
+    print(f'legacy: {legacy_memory / 2**20:.0f}MiB, compact: {memory / 2**20:.0f}MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+from typing import Dict
+from typing import List
+
+import click
+import numpy as np
+import pandas as pd
+
+from cloud_validol.loader.lib import cot
+from cloud_validol.loader.reports import ice
+
+# the yearly reports have this many columns, most of which aren't loaded
+REPORT_COLUMNS = 190
+
+
+def _legacy_parse(
+    configs: List[cot.DerivativeConfig], doc_paths: List[str]
+) -> Dict[str, pd.DataFrame]:
+    overall_dfs = []
+    for doc_path in doc_paths:
+        df = pd.read_csv(doc_path)
+        df = df.rename(columns=ice.COLUMN_RENAMES)
+        overall_dfs.append(df)
+
+    overall_df = pd.concat(overall_dfs)
+    overall_df = overall_df.replace('#VALUE!', None)
+
+    result = {}
+    for config in configs:
+        raw_df = overall_df[
+            overall_df[ice.REPORT_TYPE_COL] == config.download_config.report_type_filter
+        ]
+        result[config.source] = cot.process_raw_dataframe(
+            config, config.date_format, raw_df
+        )
+
+    return result
+
+
+def _parse(
+    configs: List[cot.DerivativeConfig], doc_paths: List[str]
+) -> Dict[str, pd.DataFrame]:
+    config_by_report_type = {
+        config.download_config.report_type_filter: config for config in configs
+    }
+
+    raw_dfs: Dict[str, List[pd.DataFrame]] = {config.source: [] for config in configs}
+    for doc_path in doc_paths:
+        for report_type, raw_df in ice._read_doc(configs, doc_path).groupby(
+            ice.REPORT_TYPE_COL
+        ):
+            raw_dfs[config_by_report_type[report_type].source].append(raw_df)
+
+    return {
+        config.source: cot.process_raw_dataframe(
+            config, config.date_format, pd.concat(raw_dfs[config.source])
+        )
+        for config in configs
+    }
+
+
+def _make_doc(config: cot.DerivativeConfig, year: int, rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(year)
+    derivative_ids = rng.integers(0, 300, rows)
+    dates = pd.date_range(f'{year}-01-03', periods=52, freq='7D')
+
+    columns = {
+        config.platform_code_col: [f'B{x:04d}' for x in derivative_ids],
+        config.derivative_name_col: [
+            f'DERIVATIVE-{x} - ICE FUTURES EUROPE' for x in derivative_ids
+        ],
+        config.date_col: dates[rng.integers(0, len(dates), rows)].strftime(
+            config.date_format
+        ),
+        ice.REPORT_TYPE_COL: rng.choice(['FutOnly', 'Combined'], rows),
+    }
+    for column in config.data_cols:
+        columns[column] = rng.integers(0, 10**6, rows)
+    for index in range(REPORT_COLUMNS - len(columns)):
+        columns[f'Unused_{index}'] = rng.integers(0, 10**6, rows)
+    raw_df = pd.DataFrame(columns)
+
+    # concentration ratios are occasionally broken in the reports
+    raw_df['Conc_Net_LE_4_TDR_Long_All'] = raw_df['Conc_Net_LE_4_TDR_Long_All'].where(
+        rng.random(rows) > 0.01, '#VALUE!'
+    )
+
+    return raw_df.rename(
+        columns={value: key for key, value in ice.COLUMN_RENAMES.items()}
+    )
+
+
+def _measure(
+    parse: Callable[[List[cot.DerivativeConfig], List[str]], Dict[str, pd.DataFrame]],
+    configs: List[cot.DerivativeConfig],
+    doc_paths: List[str],
+):
+    start = time.process_time()
+    result = parse(configs, doc_paths)
+    cpu_time = time.process_time() - start
+
+    # tracemalloc slows allocations down, so the memory is measured in another run
+    tracemalloc.start()
+    parse(configs, doc_paths)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, cpu_time, peak_memory
+
+
+@click.command()
+@click.option('--years', default=10, show_default=True)
+@click.option('--rows-per-year', default=20000, show_default=True)
+def main(years, rows_per_year):
+    configs = ice._make_derivative_configs()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        doc_paths = []
+        for year in range(2011, 2011 + years):
+            doc_path = os.path.join(tmp_dir, f'COTHist{year}.csv')
+            _make_doc(configs[0], year, rows_per_year).to_csv(doc_path, index=False)
+            doc_paths.append(doc_path)
+
+        legacy_result, legacy_time, legacy_memory = _measure(
+            _legacy_parse, configs, doc_paths
+        )
+        result, time_, memory = _measure(_parse, configs, doc_paths)
+
+    for config in configs:
+        # the legacy code pads #VALUE! cells with the previous values instead of NULLs
+        pd.testing.assert_frame_equal(
+            legacy_result[config.source].drop(columns='x_4l_percent'),
+            result[config.source].drop(columns='x_4l_percent'),
+            check_dtype=False,
+        )
+
+    print(
+        f'legacy: {legacy_time:.2f}s CPU, {legacy_memory / 2**20:.0f}MiB peak; '
+        f'single pass: {time_:.2f}s CPU, {memory / 2**20:.0f}MiB peak'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+import dataclasses
+import datetime as dt
+import io
+import os
+from typing import Dict
+from typing import Optional
+import urllib.parse
+import zipfile
+
+import numpy as np
+import pandas as pd
+import requests
+
+from cloud_validol.loader.lib import cot
+from cloud_validol.loader.reports import cftc
+from cloud_validol.loader.reports import ice
+from cloud_validol.loader.reports import moex
+
+CFTC_HISTORY_FROM_YEAR = 2006
+FRED_GRAPHS = {
+    'BOGMBASEW': pd.offsets.Week(weekday=2),
+    'ASTDSL': pd.offsets.QuarterBegin(startingMonth=1),
+}
+FRED_FROM = dt.date(1959, 1, 1)
+
+
+@dataclasses.dataclass
+class Scale:
+    derivatives: int
+    moex_contracts: int
+    seed: int
+
+
+def get_fixture_path(
+    root: str, url: str, params: Optional[Dict[str, str]] = None
+) -> str:
+    # the same layout the stand-in server maps mirrored requests onto
+    full_url = requests.Request('GET', url, params=params).prepare().url
+    split_url = urllib.parse.urlsplit(full_url)
+    path = os.path.join(root, split_url.netloc + split_url.path)
+
+    return os.path.join(path, split_url.query) if split_url.query else path
+
+
+def _write(path: str, content: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as outfile:
+        outfile.write(content)
+
+
+def _get_cot_dates(from_year: int, to_year: int) -> pd.DatetimeIndex:
+    dates = pd.date_range(
+        dt.date(from_year, 1, 1), dt.date(to_year, 12, 31), freq='W-TUE'
+    )
+
+    return dates[dates.date <= dt.date.today()]
+
+
+def _make_cot_frame(
+    rng: np.random.Generator,
+    config: cot.DerivativeConfig,
+    date_format: str,
+    dates: pd.DatetimeIndex,
+    derivatives: int,
+) -> pd.DataFrame:
+    derivative_ids = np.tile(np.arange(derivatives), len(dates))
+
+    raw_df = pd.DataFrame(
+        {
+            config.platform_code_col: [f'{x:06d} ' for x in derivative_ids],
+            config.derivative_name_col: [
+                f'DERIVATIVE {x} - EXCHANGE {x % 7}' for x in derivative_ids
+            ],
+            config.date_col: np.repeat(dates.strftime(date_format), derivatives),
+        }
+    )
+    for column, data_col in config.data_cols.items():
+        if data_col.endswith(cot.PERCENTS_SUFFIX):
+            raw_df[column] = rng.uniform(0, 100, len(raw_df)).round(1)
+        else:
+            raw_df[column] = rng.integers(0, 10**6, len(raw_df))
+
+    return raw_df
+
+
+def _zip_csv(raw_df: pd.DataFrame) -> bytes:
+    content = io.BytesIO()
+    with zipfile.ZipFile(content, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr('annual.txt', raw_df.to_csv(index=False))
+
+    return content.getvalue()
+
+
+def write_cftc(root: str, scale: Scale, rng: np.random.Generator):
+    today = dt.date.today()
+
+    for config in cftc._make_derivative_configs():
+        docs = [
+            (
+                config.download_config.initial_download_url,
+                config.download_config.initial_date_format or config.date_format,
+                _get_cot_dates(CFTC_HISTORY_FROM_YEAR, config.initial_from_year - 1),
+            )
+        ]
+        for year in range(config.initial_from_year, today.year + 1):
+            docs.append(
+                (
+                    config.download_config.year_download_url.format(year=year),
+                    config.date_format,
+                    _get_cot_dates(year, year),
+                )
+            )
+
+        for url, date_format, dates in docs:
+            raw_df = _make_cot_frame(rng, config, date_format, dates, scale.derivatives)
+            _write(get_fixture_path(root, url), _zip_csv(raw_df))
+
+
+def write_ice(root: str, scale: Scale, rng: np.random.Generator):
+    configs = ice._make_derivative_configs()
+
+    for year in range(configs[0].initial_from_year, dt.date.today().year + 1):
+        dates = _get_cot_dates(year, year)
+
+        raw_dfs = []
+        for config in configs:
+            raw_df = _make_cot_frame(
+                rng, config, config.date_format, dates, scale.derivatives
+            )
+            raw_df[ice.REPORT_TYPE_COL] = config.download_config.report_type_filter
+            raw_dfs.append(raw_df)
+
+        raw_df = pd.concat(raw_dfs).rename(
+            columns={
+                column: raw_column for raw_column, column in ice.COLUMN_RENAMES.items()
+            }
+        )
+
+        url = f'https://www.theice.com/publicdocs/futures/COTHist{year}.csv'
+        _write(get_fixture_path(root, url), raw_df.to_csv(index=False).encode())
+
+
+def _make_moex_doc(
+    rng: np.random.Generator, date: dt.date, contracts: int
+) -> pd.DataFrame:
+    names = np.repeat([f'CONTRACT-{x}' for x in range(contracts)], 2)
+    rows = len(names)
+
+    return pd.DataFrame(
+        {
+            'moment': date.isoformat(),
+            'isin': names,
+            'name': names,
+            'contract_type': np.repeat(
+                np.array(list(moex.CONTRACT_TYPE_MAPPING))[
+                    np.arange(contracts) % len(moex.CONTRACT_TYPE_MAPPING)
+                ],
+                2,
+            ),
+            'iz_fiz': np.tile([1, np.nan], contracts),
+            'clients_in_long': rng.integers(0, 1000, rows),
+            'clients_in_short': rng.integers(0, 1000, rows),
+            'short_position': rng.integers(0, 10**6, rows),
+            'long_position': rng.integers(0, 10**6, rows),
+            'change_prev_long_perc': rng.normal(size=rows),
+            'change_prev_short_perc': rng.normal(size=rows),
+        }
+    )
+
+
+def write_moex(root: str, scale: Scale, rng: np.random.Generator):
+    for date in moex._get_trading_dates(moex.GLOBAL_FROM, dt.date.today()):
+        params = {'d': moex._dt_serializer(date)}
+        doc = _make_moex_doc(rng, date, scale.moex_contracts)
+
+        _write(
+            get_fixture_path(root, moex.DOWNLOAD_URL, params),
+            doc.to_csv(index=False).encode(),
+        )
+
+
+def write_monetary(root: str, scale: Scale, rng: np.random.Generator):
+    url = 'https://fred.stlouisfed.org/graph/fredgraph.csv'
+
+    for graph_id, offset in FRED_GRAPHS.items():
+        dates = pd.date_range(FRED_FROM, dt.date.today(), freq=offset)
+        values = pd.Series(rng.uniform(1000, 10**6, len(dates)).round(1)).astype(str)
+        # FRED marks missing observations with a dot
+        values[rng.random(len(dates)) < 0.01] = '.'
+
+        doc = pd.DataFrame({'DATE': dates.strftime('%Y-%m-%d'), graph_id: values})
+        _write(
+            get_fixture_path(root, url, {'id': graph_id}),
+            doc.to_csv(index=False).encode(),
+        )
+
+
+WRITERS = {
+    'cftc': write_cftc,
+    'ice': write_ice,
+    'moex': write_moex,
+    'monetary': write_monetary,
+}
+
+
+def write(root: str, source: str, scale: Scale):
+    WRITERS[source](root, scale, np.random.default_rng(scale.seed))
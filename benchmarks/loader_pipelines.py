@@ -0,0 +1,223 @@
+import collections
+import contextlib
+import functools
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from unittest import mock
+
+import click
+
+from cloud_validol.lib import secdist
+from cloud_validol.loader.lib import cot
+from cloud_validol.loader.lib import download_cache
+from cloud_validol.loader.lib import pg
+from cloud_validol.loader.reports import cftc
+from cloud_validol.loader.reports import ice
+from cloud_validol.loader.reports import moex
+from cloud_validol.loader.reports import monetary
+from cloud_validol.loader.reports import refresh_views
+
+import loader_fixtures
+import loader_services
+
+DBNAME = 'validol_benchmark'
+SOURCES = {
+    'cftc': cftc.update,
+    'ice': ice.update,
+    # the real rate limit would make the scenario measure sleeping
+    'moex': functools.partial(
+        moex.update, requests_per_second=10**6, max_in_flight_requests=8
+    ),
+    'monetary': monetary.update,
+}
+# stages time the functions they are made of excluding the nested stages,
+# so a download done while parsing is accounted as a download
+STAGE_FUNCTIONS = [
+    ('download', download_cache, 'fetch'),
+    ('parse', cftc, '_read_doc'),
+    ('parse', ice, '_read_doc'),
+    ('parse', cot, 'process_raw_dataframe'),
+    ('parse', moex, '_parse_doc'),
+    ('parse', monetary, '_download_graphs'),
+    ('upsert', cot, 'insert_platforms_derivatives'),
+    ('upsert', moex, '_insert_data'),
+    ('insert', pg, 'copy_insert'),
+    ('refresh', refresh_views, 'update'),
+]
+
+
+class StageTimer:
+    def __init__(self):
+        self.durations: Dict[str, float] = collections.Counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _account(self, now: float):
+        stack = self._local.__dict__.setdefault('stack', [])
+        if stack:
+            with self._lock:
+                self.durations[stack[-1]] += now - self._local.started_at
+
+        self._local.started_at = now
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self._account(time.perf_counter())
+        self._local.stack.append(name)
+        try:
+            yield
+        finally:
+            self._account(time.perf_counter())
+            self._local.stack.pop()
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.stage(name):
+                result = func(*args, **kwargs)
+
+            if not isinstance(result, Iterator):
+                return result
+
+            # generators do their work while being iterated
+            return self._wrap_iterator(name, result)
+
+        return wrapper
+
+    def _wrap_iterator(self, name: str, iterator: Iterator) -> Iterator:
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+
+            yield item
+
+
+def _run_scenario(
+    postgres: loader_services.DisposablePostgres, source: str
+) -> Dict[str, Any]:
+    postgres.recreate_database(DBNAME)
+    os.environ.update(postgres.get_env(DBNAME))
+
+    timer = StageTimer()
+    engine = pg.get_engine()
+    conn = pg.get_connection()
+    try:
+        with contextlib.ExitStack() as stack:
+            for stage, module, name in STAGE_FUNCTIONS:
+                stack.enter_context(
+                    mock.patch.object(
+                        module, name, timer.wrap(stage, getattr(module, name))
+                    )
+                )
+
+            started_at = time.perf_counter()
+            written_rows = collections.Counter(SOURCES[source](engine, conn))
+
+            # new series are hidden until shown from the admin,
+            # so the refresh would have nothing to serve otherwise
+            with conn.cursor() as cursor:
+                for table_name in refresh_views.INFO_TABLES_VIEWS:
+                    cursor.execute(
+                        f'UPDATE validol_internal.{table_name} SET visible = TRUE'
+                    )
+                    written_rows[table_name] += cursor.rowcount
+            conn.commit()
+
+            refresh_views.update(engine, conn, written_rows)
+            duration = time.perf_counter() - started_at
+    finally:
+        conn.close()
+        engine.dispose()
+
+    return {
+        'duration': duration,
+        # stages of concurrent downloads add up to more than the duration
+        'stages': dict(timer.durations),
+        'written_rows': dict(written_rows),
+    }
+
+
+@click.command()
+@click.option('--source', '-s', multiple=True, default=list(SOURCES), show_default=True)
+@click.option(
+    '--derivatives',
+    default=100,
+    show_default=True,
+    help='Derivatives in every CFTC and ICE report',
+)
+@click.option(
+    '--moex-contracts',
+    default=20,
+    show_default=True,
+    help='Contracts in every MOEX daily report',
+)
+@click.option('--seed', default=0, show_default=True)
+@click.option(
+    '--pg-bin',
+    default=lambda: os.path.dirname(shutil.which('initdb') or ''),
+    help='Directory with initdb and pg_ctl of the disposable Postgres',
+)
+@click.option('--output', '-o', type=click.File('w'), default='-')
+def main(
+    source: List[str],
+    derivatives: int,
+    moex_contracts: int,
+    seed: int,
+    pg_bin: str,
+    output,
+):
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)s:%(message)s',
+        level=logging.INFO,
+        datefmt='[%Y-%m-%d %H:%M:%S]',
+    )
+
+    if os.path.isfile(secdist.SECDIST_PATH):
+        raise click.ClickException(
+            f'{secdist.SECDIST_PATH} would point the loaders at a real database'
+        )
+
+    scale = loader_fixtures.Scale(
+        derivatives=derivatives, moex_contracts=moex_contracts, seed=seed
+    )
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir, loader_services.disposable_postgres(
+        pg_bin
+    ) as postgres:
+        fixtures_path = os.path.join(tmp_dir, 'fixtures')
+        for s in source:
+            loader_fixtures.write(fixtures_path, s, scale)
+
+        with loader_services.stand_in_server(
+            fixtures_path
+        ) as mirror, loader_services.mirrored_requests(mirror):
+            for s in source:
+                # every scenario downloads its reports anew
+                download_cache.configure(
+                    path=os.path.join(tmp_dir, 'cache', s), offline=False
+                )
+
+                results[s] = _run_scenario(postgres, s)
+
+    json.dump(
+        {'scale': vars(scale), 'scenarios': results}, output, indent=2, sort_keys=True
+    )
+    output.write('\n')
+
+
+if __name__ == '__main__':
+    main()
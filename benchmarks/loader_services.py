@@ -0,0 +1,200 @@
+import contextlib
+import functools
+import http.server
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+from typing import Dict
+from typing import Iterator
+from unittest import mock
+import urllib.parse
+
+import psycopg2
+import requests
+
+import cloud_validol
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_PATH = os.path.join(
+    os.path.dirname(cloud_validol.__file__), 'postgresql', 'pgmigrate', 'migrations'
+)
+TEMPLATE_DB = 'validol_template'
+
+
+class _FixtureHandler(http.server.BaseHTTPRequestHandler):
+    def __init__(self, *args, root: str, **kwargs):
+        self.root = root
+
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        # <mirror>/<host>/<path>?<query> is served from <root>/<host>/<path>/<query>
+        split_path = urllib.parse.urlsplit(self.path)
+        relative_path = os.path.normpath(split_path.path.lstrip('/'))
+        if split_path.query:
+            relative_path = os.path.join(relative_path, split_path.query)
+
+        path = os.path.join(self.root, relative_path)
+        if relative_path.startswith('..') or not os.path.isfile(path):
+            self.send_error(404)
+
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Length', str(os.path.getsize(path)))
+        self.end_headers()
+
+        with open(path, 'rb') as infile:
+            shutil.copyfileobj(infile, self.wfile)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+@contextlib.contextmanager
+def stand_in_server(root: str) -> Iterator[str]:
+    server = http.server.ThreadingHTTPServer(
+        ('127.0.0.1', 0), functools.partial(_FixtureHandler, root=root)
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield f'http://127.0.0.1:{server.server_port}'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _MirrorAdapter(requests.adapters.HTTPAdapter):
+    def __init__(self, mirror: str):
+        super().__init__()
+
+        self.mirror = mirror
+
+    def send(self, request, **kwargs):
+        # <host>/<path>?<query> is requested as <mirror>/<host>/<path>?<query>
+        url = request.url
+        split_url = urllib.parse.urlsplit(url)
+        request.url = urllib.parse.urlunsplit(
+            urllib.parse.urlsplit(self.mirror)._replace(
+                path=f'/{split_url.netloc}{split_url.path}', query=split_url.query
+            )
+        )
+
+        response = super().send(request, **kwargs)
+        # the loaders see the response as if it came from the original host
+        response.url = url
+
+        return response
+
+
+@contextlib.contextmanager
+def mirrored_requests(mirror: str) -> Iterator[None]:
+    adapter = _MirrorAdapter(mirror)
+
+    with requests.Session() as session:
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        # the loaders download with requests.get
+        with mock.patch.object(requests, 'get', session.get):
+            yield
+
+
+def _get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+
+        return sock.getsockname()[1]
+
+
+class DisposablePostgres:
+    def __init__(self, port: int):
+        self.port = port
+
+    def _connect(self, dbname: str) -> psycopg2.extensions.connection:
+        conn = psycopg2.connect(
+            user='postgres', dbname=dbname, host='127.0.0.1', port=self.port
+        )
+        conn.autocommit = True
+
+        return conn
+
+    def create_template(self):
+        conn = self._connect('postgres')
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f'CREATE DATABASE {TEMPLATE_DB}')
+        finally:
+            conn.close()
+
+        conn = self._connect(TEMPLATE_DB)
+        try:
+            for migration in sorted(os.listdir(MIGRATIONS_PATH)):
+                logger.info('Applying %s', migration)
+
+                with open(os.path.join(MIGRATIONS_PATH, migration)) as infile:
+                    with conn.cursor() as cursor:
+                        cursor.execute(infile.read())
+        finally:
+            conn.close()
+
+    def recreate_database(self, dbname: str):
+        conn = self._connect('postgres')
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f'DROP DATABASE IF EXISTS {dbname} WITH (FORCE)')
+                cursor.execute(f'CREATE DATABASE {dbname} TEMPLATE {TEMPLATE_DB}')
+        finally:
+            conn.close()
+
+    def get_env(self, dbname: str) -> Dict[str, str]:
+        # libpq and asyncpg pick the port up from PGPORT
+        return {
+            'DATABASE_USER': 'postgres',
+            'DATABASE_PASSWORD': '',
+            'DATABASE_DB': dbname,
+            'DATABASE_HOST': '127.0.0.1',
+            'PGPORT': str(self.port),
+        }
+
+
+def _run(bin_dir: str, *args: str):
+    subprocess.run(
+        [os.path.join(bin_dir, args[0]), *args[1:]],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+@contextlib.contextmanager
+def disposable_postgres(bin_dir: str) -> Iterator[DisposablePostgres]:
+    with tempfile.TemporaryDirectory() as data_dir:
+        _run(bin_dir, 'initdb', '-D', data_dir, '-U', 'postgres', '--auth=trust')
+
+        postgres = DisposablePostgres(_get_free_port())
+        _run(
+            bin_dir,
+            'pg_ctl',
+            'start',
+            '-D',
+            data_dir,
+            '-l',
+            os.path.join(data_dir, 'postgres.log'),
+            '-w',
+            '-o',
+            f'-p {postgres.port} -k {data_dir} -c listen_addresses=127.0.0.1',
+        )
+
+        try:
+            postgres.create_template()
+
+            yield postgres
+        finally:
+            _run(bin_dir, 'pg_ctl', 'stop', '-D', data_dir, '-m', 'immediate')
@@ -0,0 +1,111 @@
+import datetime as dt
+import os
+import tempfile
+import time
+from typing import Optional
+
+import click
+import numpy as np
+import pandas as pd
+import pytz
+
+from cloud_validol.loader.reports import moex
+
+
+def _legacy_parse_doc(doc_path: str) -> Optional[pd.DataFrame]:
+    df = pd.read_csv(
+        doc_path,
+        parse_dates=['moment'],
+        date_parser=lambda x: dt.datetime.fromisoformat(x).replace(tzinfo=pytz.UTC),
+    )
+
+    if df.empty:
+        return None
+
+    df = df.rename(columns={'moment': 'event_dttm', 'isin': 'code'})
+
+    df.name = df.apply(
+        lambda row: '{} ({})'.format(
+            row['name'], moex.CONTRACT_TYPE_MAPPING[row.contract_type]
+        ),
+        axis=1,
+    )
+    df.iz_fiz.fillna(0, inplace=True)
+
+    keys = ['event_dttm', 'name']
+
+    return pd.DataFrame(
+        [
+            {
+                **{
+                    '{}{}'.format(moex.PHYS_MAPPING[row.iz_fiz], value): row[key]
+                    for _, row in content.iterrows()
+                    for key, value in moex.CSV_MAPPING.items()
+                },
+                **dict(zip(keys, group)),
+            }
+            for group, content in df.groupby(keys)
+        ]
+    )
+
+
+def _make_doc(contracts: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    names = [f'CONTRACT-{x}' for x in range(contracts)]
+    contract_types = rng.choice(list(moex.CONTRACT_TYPE_MAPPING), contracts)
+
+    rows = []
+    for name, contract_type in zip(names, contract_types):
+        for iz_fiz in [1, None]:
+            rows.append(
+                {
+                    'moment': '2021-06-01',
+                    'isin': name,
+                    'name': name,
+                    'contract_type': contract_type,
+                    'iz_fiz': iz_fiz,
+                    'clients_in_long': rng.integers(0, 1000),
+                    'clients_in_short': rng.integers(0, 1000),
+                    'short_position': rng.integers(0, 10**6),
+                    'long_position': rng.integers(0, 10**6),
+                    'change_prev_long_perc': rng.normal(),
+                    'change_prev_short_perc': rng.normal(),
+                }
+            )
+
+    return pd.DataFrame(rows)
+
+
+def _measure(parse, doc_path: str, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        df = parse(doc_path)
+
+    return df, (time.perf_counter() - start) / repeat
+
+
+@click.command()
+@click.option('--contracts', default=3000, show_default=True)
+@click.option('--repeat', default=5, show_default=True)
+def main(contracts, repeat):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        doc_path = os.path.join(tmp_dir, 'open-positions.csv')
+        _make_doc(contracts).to_csv(doc_path, index=False)
+
+        legacy_df, legacy_time = _measure(_legacy_parse_doc, doc_path, repeat)
+        df, vectorized_time = _measure(moex._parse_doc, doc_path, repeat)
+
+    pd.testing.assert_frame_equal(
+        legacy_df[sorted(legacy_df.columns)],
+        df[sorted(df.columns)],
+        check_dtype=False,
+    )
+
+    print(
+        f'legacy: {legacy_time * 1000:.0f}ms per day, '
+        f'vectorized: {vectorized_time * 1000:.0f}ms per day'
+    )
+
+
+if __name__ == '__main__':
+    main()
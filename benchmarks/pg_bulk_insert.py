@@ -0,0 +1,113 @@
+import time
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import List
+
+import click
+import numpy as np
+import pandas as pd
+import sqlalchemy
+
+from cloud_validol.loader.lib import pg
+
+
+SCHEMA = 'validol_benchmark'
+TABLE_NAME = 'cot_futures_only_data'
+SERIES_COUNT = 500
+
+
+def _legacy_insert_on_conflict_do_nothing(
+    table: pd.io.sql.SQLTable,
+    conn: sqlalchemy.engine.base.Connection,
+    keys: List[str],
+    data_iter: Iterable[Iterable[Any]],
+):
+    data = [dict(zip(keys, row)) for row in data_iter]
+    insert_stmt = sqlalchemy.dialects.postgresql.insert(
+        table.table, values=data, bind=conn
+    ).on_conflict_do_nothing()
+    conn.execute(insert_stmt)
+
+
+def _make_df(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    weeks = pd.date_range('1986-01-07', periods=rows // SERIES_COUNT + 1, freq='7D')
+
+    df = pd.DataFrame(
+        {
+            'series_id': np.arange(rows) % SERIES_COUNT + 1,
+            'event_dttm': weeks[np.arange(rows) // SERIES_COUNT].tz_localize('UTC'),
+        }
+    )
+    for column in ['oi', 'ncl', 'ncs', 'cl', 'cs', 'nrl', 'nrs']:
+        df[column] = rng.integers(0, 10**6, rows)
+    for column in ['x_4l_percent', 'x_4s_percent', 'x_8l_percent', 'x_8s_percent']:
+        df[column] = rng.integers(0, 1000, rows) / 10
+
+    return df
+
+
+def _insert_legacy(engine: sqlalchemy.engine.base.Engine, df: pd.DataFrame):
+    df.to_sql(
+        TABLE_NAME,
+        engine,
+        schema=SCHEMA,
+        index=False,
+        if_exists='append',
+        method=_legacy_insert_on_conflict_do_nothing,
+        chunksize=10000,
+    )
+
+
+def _insert_copy(engine: sqlalchemy.engine.base.Engine, df: pd.DataFrame):
+    with pg.get_connection() as conn:
+        pg.copy_insert(conn, TABLE_NAME, df, on_conflict_do_nothing=True, schema=SCHEMA)
+        conn.commit()
+
+
+def _measure(
+    engine: sqlalchemy.engine.base.Engine,
+    insert: Callable[[sqlalchemy.engine.base.Engine, pd.DataFrame], None],
+    df: pd.DataFrame,
+) -> float:
+    start = time.perf_counter()
+    insert(engine, df)
+
+    return len(df) / (time.perf_counter() - start)
+
+
+@click.command()
+@click.option('--rows', default=1000000, show_default=True)
+def main(rows):
+    engine = pg.get_engine()
+    df = _make_df(rows)
+
+    with engine.begin() as conn:
+        conn.execute(f'CREATE SCHEMA IF NOT EXISTS {SCHEMA}')
+        conn.execute(
+            f'''
+            CREATE TABLE {SCHEMA}.{TABLE_NAME}
+            (LIKE validol_internal.{TABLE_NAME} INCLUDING ALL)
+        '''
+        )
+
+    try:
+        for name, insert in [('to_sql', _insert_legacy), ('copy', _insert_copy)]:
+            with engine.begin() as conn:
+                conn.execute(f'TRUNCATE TABLE {SCHEMA}.{TABLE_NAME}')
+
+            fresh_rate = _measure(engine, insert, df)
+            conflict_rate = _measure(engine, insert, df)
+
+            print(
+                f'{name}: {fresh_rate:.0f} rows/sec into an empty table, '
+                f'{conflict_rate:.0f} rows/sec when all rows conflict'
+            )
+    finally:
+        with engine.begin() as conn:
+            conn.execute(f'DROP SCHEMA {SCHEMA} CASCADE')
+
+
+if __name__ == '__main__':
+    main()
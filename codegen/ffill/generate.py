@@ -1,23 +1,45 @@
 import os
 
+import click
 import jinja2
 
 from cloud_validol.lib import datasets
 
 
 CURRENT_DIR = os.path.dirname(os.path.realpath(__file__))
-
-
-def main():
+TARGETS = {
+    # materialized views recomputed from scratch on every refresh
+    'views': 'views.jinja',
+    # tables maintained incrementally by validol_internal.refresh_<name>() functions
+    'serving_tables': 'serving_tables.jinja',
+    # the deletion triggers and refresh functions of the serving tables alone
+    'serving_refresh': 'serving_refresh.jinja',
+    # yearly partitions of the data tables, rows past them go to the default ones
+    'partitions': 'partitions.jinja',
+}
+PARTITIONED_TO_YEAR = 2040
+
+
+def render(target: str) -> str:
     env = jinja2.Environment(
         loader=jinja2.FileSystemLoader(os.path.join(CURRENT_DIR, 'templates')),
         trim_blocks=True,
         lstrip_blocks=True,
     )
-    template = env.get_template('views.jinja')
+    template = env.get_template(TARGETS[target])
+
+    return template.render(
+        views=datasets.SCHEMA, partitioned_to_year=PARTITIONED_TO_YEAR
+    )
+
 
-    return template.render(views=datasets.SCHEMA)
+@click.command()
+@click.option(
+    '--target', type=click.Choice(list(TARGETS)), default='views', show_default=True
+)
+def main(target):
+    print(render(target))
 
 
 if __name__ == '__main__':
-    print(main())
+    main()
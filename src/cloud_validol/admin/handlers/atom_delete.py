@@ -2,7 +2,6 @@ import logging
 
 from aiohttp import web
 
-from cloud_validol.admin.lib.atoms import grammar as atom_grammar
 from cloud_validol.admin.lib.server import atoms as server_atoms
 
 
@@ -12,8 +11,8 @@ logger = logging.getLogger(__name__)
 async def handle(request: web.Request) -> web.Response:
     atom_name = request.query['name']
 
-    user_expressions = await server_atoms.get_user_expressions(request)
-    atom_graph = atom_grammar.build_atom_graph(user_expressions)
+    atom_library = await server_atoms.get_atom_library(request)
+    atom_graph = atom_library.graph
 
     if atom_name not in atom_graph:
         raise web.HTTPNotFound(reason=f'Atom \'{atom_name}\' not found')
@@ -8,6 +8,7 @@ from cloud_validol.admin.lib import superset
 from cloud_validol.admin.lib.atoms import grammar as atom_grammar
 from cloud_validol.admin.lib.server import atoms as server_atoms
 from cloud_validol.admin.lib.server import base as server_base
+from cloud_validol.admin.lib.server import superset as server_superset
 
 
 logger = logging.getLogger(__name__)
@@ -29,8 +30,9 @@ async def handle(request: web.Request) -> web.Response:
     except atom_grammar.ParseError as exc:
         raise web.HTTPBadRequest(reason=f'Bad atom name: {exc}')
 
-    async with superset.superset_session() as session:
-        dataset = await superset.get_dataset(session, request_body.superset_dataset_id)
+    dataset = await server_superset.get_dataset(
+        request, request_body.superset_dataset_id
+    )
     user_expressions = await server_atoms.get_user_expressions(request)
 
     dataset_columns = superset.parse_dataset_columns(
@@ -22,8 +22,8 @@ class Request:
 
 async def handle(request: web.Request) -> web.Response:
     request_body = await server_base.deser_request_body(request, Request)
-    user_expressions = await server_atoms.get_user_expressions(request)
-    atom_graph = atom_grammar.build_atom_graph(user_expressions)
+    atom_library = await server_atoms.get_atom_library(request)
+    atom_graph = atom_library.graph
 
     if request_body.name not in atom_graph:
         raise web.HTTPNotFound(reason=f'Atom \'{request_body.name}\' not found')
@@ -38,7 +38,7 @@ async def handle(request: web.Request) -> web.Response:
             allow_unknown_atoms=True,
             expression=request_body.expression,
             library=atom_grammar.ExpressionLibrary(
-                user_expressions=user_expressions,
+                user_expressions=atom_library.user_expressions,
                 basic_atoms=[],
             ),
         )
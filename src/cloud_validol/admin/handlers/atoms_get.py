@@ -1,5 +1,4 @@
 from aiohttp import web
-import asyncio
 import dataclasses
 import enum
 import logging
@@ -55,48 +54,52 @@ class Response:
     datasets: List[Dataset]
 
 
-async def _get_datasets() -> List[superset.DatasetItemView]:
-    async with superset.superset_session() as session:
-        superset_datasets = await superset.get_datasets(session)
-
-        return await asyncio.gather(
-            *[
-                superset.get_dataset(session, dataset.id)
-                for dataset in superset_datasets
-            ]
-        )
-
-
 def _make_response_dataset(
-    superset_dataset: superset.DatasetItemView, user_expressions: Dict[str, str]
+    superset_dataset: superset.DatasetItemView,
+    superset_columns_info: superset.DatasetColumnsInfo,
+    user_expressions: Dict[str, str],
+    resolved_atoms: Dict[str, atom_grammar.ResolvedAtom],
+    basic_atoms_expressions: Dict[str, str],
 ) -> Dataset:
-    superset_columns_info = server_superset.parse_dataset_columns(
-        superset_dataset, list(user_expressions)
-    )
-    library = atom_grammar.ExpressionLibrary(
-        basic_atoms=superset_columns_info.basic_atoms,
-        user_expressions=user_expressions,
-    )
+    basic_atoms = set(superset_columns_info.basic_atoms)
 
     result_columns = []
     for basic_atom in superset_columns_info.basic_atoms:
         result_columns.append(Column(name=basic_atom, state=ColumnState.BASIC.value))
 
+    # built only if some of the atoms need to be parsed for this dataset alone
+    library: Optional[atom_grammar.ExpressionLibrary] = None
+
     for atom, user_expression_str in user_expressions.items():
-        try:
-            stack = atom_grammar.get_stack(
-                allow_unknown_atoms=False,
-                library=library,
-                expression=user_expression_str,
-            )
-        except atom_grammar.ParseError:
-            logger.info(
-                'Atom %s is not available for dataset %s', atom, superset_dataset.id
-            )
-            continue
+        resolved_atom = resolved_atoms.get(atom)
+        if resolved_atom is not None and resolved_atom.basic_atoms <= basic_atoms:
+            basic_atoms_expression = basic_atoms_expressions[atom]
+        else:
+            # the atoms are resolved against the basic atoms of all of the datasets,
+            # a longer basic atom of another dataset may hide the ones of this dataset
+            if library is None:
+                library = atom_grammar.ExpressionLibrary(
+                    basic_atoms=superset_columns_info.basic_atoms,
+                    user_expressions=user_expressions,
+                )
+
+            try:
+                stack = atom_grammar.get_stack(
+                    allow_unknown_atoms=False,
+                    library=library,
+                    expression=user_expression_str,
+                )
+            except atom_grammar.ParseError:
+                logger.info(
+                    'Atom %s is not available for dataset %s',
+                    atom,
+                    superset_dataset.id,
+                )
+                continue
+
+            basic_atoms_expression = atom_grammar.render_stack(stack)
 
         logger.info('Processing atom %s for dataset %s', atom, superset_dataset.id)
-        basic_atoms_expression = atom_grammar.render_stack(stack)
 
         superset_expression_str = superset_columns_info.expressions.get(atom)
         if superset_expression_str is not None:
@@ -141,13 +144,40 @@ def _make_response_dataset(
 
 
 async def handle(request: web.Request) -> web.Response:
-    superset_datasets = await _get_datasets()
-    user_expressions = await server_atoms.get_user_expressions(request)
+    superset_datasets = await server_superset.get_datasets(request)
+    atom_library = await server_atoms.get_atom_library(request)
+    user_expressions = atom_library.user_expressions
+
+    superset_columns_infos = [
+        server_superset.parse_dataset_columns(superset_dataset, list(user_expressions))
+        for superset_dataset in superset_datasets
+    ]
+
+    # user atoms are expanded to basic atoms once for all of the datasets
+    resolved_atoms = atom_library.resolve(
+        frozenset(
+            basic_atom
+            for superset_columns_info in superset_columns_infos
+            for basic_atom in superset_columns_info.basic_atoms
+        )
+    )
+    basic_atoms_expressions = {
+        atom: atom_grammar.render_stack(resolved_atom.stack)
+        for atom, resolved_atom in resolved_atoms.items()
+    }
 
     response_datasets = []
-    for superset_dataset in superset_datasets:
+    for superset_dataset, superset_columns_info in zip(
+        superset_datasets, superset_columns_infos
+    ):
         response_datasets.append(
-            _make_response_dataset(superset_dataset, user_expressions)
+            _make_response_dataset(
+                superset_dataset,
+                superset_columns_info,
+                user_expressions,
+                resolved_atoms,
+                basic_atoms_expressions,
+            )
         )
 
     return web.json_response(dataclasses.asdict(Response(datasets=response_datasets)))
@@ -7,6 +7,7 @@ import marshmallow_dataclass as mdataclasses
 
 from cloud_validol.admin.lib import superset
 from cloud_validol.admin.lib.server import base as server_base
+from cloud_validol.admin.lib.server import superset as server_superset
 
 
 logger = logging.getLogger(__name__)
@@ -28,17 +29,16 @@ class Request:
 async def handle(request: web.Request) -> web.Response:
     request_body = await server_base.deser_request_body(request, Request)
 
-    async with superset.superset_session() as session:
-        await superset.push_dataset_columns(
-            session=session,
-            pk=request_body.superset_dataset_id,
-            columns=[
-                superset.ColumnExpression(
-                    name=column.name,
-                    expression=column.basic_atoms_expression,
-                )
-                for column in request_body.columns
-            ],
-        )
+    await server_superset.push_dataset_columns(
+        request,
+        pk=request_body.superset_dataset_id,
+        columns=[
+            superset.ColumnExpression(
+                name=column.name,
+                expression=column.basic_atoms_expression,
+            )
+            for column in request_body.columns
+        ],
+    )
 
     return web.Response()
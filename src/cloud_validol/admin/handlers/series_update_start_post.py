@@ -34,12 +34,10 @@ class Response:
     job_id: str
 
 
-async def job(request: web.Request) -> None:
+async def job(request: web.Request, views: List[str]) -> None:
     logger.info('Start refreshing materialized views')
 
-    async with request.app['pool'].acquire() as conn:
-        for view in refresh_views.VIEWS:
-            await conn.execute(f'REFRESH MATERIALIZED VIEW {view}')
+    await refresh_views.refresh(request.app['pool'], views)
 
     logger.info('Finished refreshing materialized views')
 
@@ -51,11 +49,13 @@ async def handle(request: web.Request) -> web.Response:
     for derivative in request_body.derivatives:
         queries[derivative.source].append([derivative.series_id, derivative.visible])
 
+    written_rows = {}
     async with request.app['pool'].acquire() as conn:
         for source in ['moex', 'cot']:
             if source not in queries:
                 continue
 
+            written_rows[f'{source}_derivatives_info'] = len(queries[source])
             await conn.execute(
                 f'''
                 UPDATE validol_internal.{source}_derivatives_info AS t SET
@@ -70,6 +70,7 @@ async def handle(request: web.Request) -> web.Response:
                 *map(list, zip(*queries[source])),
             )
 
-    job_id = await jobs.spawn(request, job(request))
+    views = refresh_views.get_affected_views(written_rows)
+    job_id = await jobs.spawn(request, job(request, views))
 
     return web.json_response(server_base.ser_response_body(Response(job_id=job_id)))
@@ -1,13 +1,18 @@
 import copy
 import dataclasses
 import enum
+import functools
 import logging
+import re
 from typing import Any
-from typing import Callable
 from typing import Dict
+from typing import FrozenSet
 from typing import Generator
 from typing import List
+from typing import Optional
 from typing import Set
+from typing import Tuple
+from typing import Union
 
 import networkx as nx
 import pyparsing as pp
@@ -15,6 +20,13 @@ import pyparsing as pp
 
 logger = logging.getLogger(__name__)
 
+# the same names make_atom_grammar accepts
+ATOM_NAME_RE = re.compile(r'[A-Za-z][A-Za-z0-9\-_]*')
+NUMBER_RE = re.compile(r'[0-9]+(\.[0-9]*)?')
+OPERATION_PRECEDENCES = {'+': 1, '-': 1, '*': 2, '/': 2}
+PARSE_CACHE_SIZE = 100000
+ATOM_NAME_LENGTHS_CACHE_SIZE = 128
+
 
 class BaseError(Exception):
     pass
@@ -41,67 +53,216 @@ class ExpressionLibrary:
     user_expressions: Dict[str, str]
     basic_atoms: List[str]
 
+    # the fingerprint parsed expressions are memoized by
+    @functools.cached_property
+    def atom_names(self) -> FrozenSet[str]:
+        return frozenset(self.user_expressions).union(self.basic_atoms)
+
+    @functools.cached_property
+    def basic_atom_names(self) -> FrozenSet[str]:
+        return frozenset(self.basic_atoms)
+
 
 def make_atom_grammar():
     return pp.Word(pp.alphas, pp.alphanums + '-_')
 
 
-def make_expression_grammar(
-    allow_unknown_atoms: bool,
-    atom_names: List[str],
-    push: Callable[[ParsedToken], None],
-):
-    push_first = lambda tokens: push(tokens[0])
-
-    point = pp.Literal('.')
-    lpar = pp.Literal('(')
-    rpar = pp.Literal(')')
-    add_op = pp.oneOf(['+', '-']).setParseAction(
-        lambda tokens: ParsedToken(type=TokenType.ARITHMETIC_OPERATION, value=tokens[0])
-    )
-    mult_op = pp.oneOf(['*', '/']).setParseAction(
-        lambda tokens: ParsedToken(type=TokenType.ARITHMETIC_OPERATION, value=tokens[0])
+class _LexemeType(enum.Enum):
+    OPERAND = 0
+    OPERATION = 1
+    LPAR = 2
+    RPAR = 3
+
+
+@dataclasses.dataclass
+class _Lexeme:
+    type: _LexemeType
+    position: int
+    token: Optional[ParsedToken] = None
+
+
+@functools.lru_cache(maxsize=ATOM_NAME_LENGTHS_CACHE_SIZE)
+def _get_atom_name_lengths(atom_names: FrozenSet[str]) -> List[int]:
+    return sorted(
+        {len(atom_name) for atom_name in atom_names if atom_name}, reverse=True
     )
 
-    atom_expressions = [
-        pp.Literal(atom_name) for atom_name in sorted(atom_names, key=lambda x: -len(x))
-    ]
+
+def _match_atom(
+    allow_unknown_atoms: bool,
+    atom_names: FrozenSet[str],
+    expression: str,
+    position: int,
+) -> Optional[str]:
+    # the longest atom name the expression continues with, whatever it is made of
+    match = None
+    for length in _get_atom_name_lengths(atom_names):
+        if expression[position : position + length] in atom_names:
+            match = expression[position : position + length]
+            break
+
     if allow_unknown_atoms:
-        atom_expressions.append(make_atom_grammar())
+        unknown_match = ATOM_NAME_RE.match(expression, position)
+        if unknown_match is not None and (
+            match is None or len(unknown_match.group()) > len(match)
+        ):
+            match = unknown_match.group()
+
+    return match
+
+
+def _tokenize(
+    allow_unknown_atoms: bool, atom_names: FrozenSet[str], expression: str
+) -> List[_Lexeme]:
+    lexemes = []
+    expect_operand = True
+    position = 0
+    while True:
+        while position < len(expression) and expression[position].isspace():
+            position += 1
+
+        if position == len(expression):
+            break
+
+        if expect_operand:
+            number_match = NUMBER_RE.match(expression, position)
+            atom_match = (
+                None
+                if number_match is not None
+                else _match_atom(allow_unknown_atoms, atom_names, expression, position)
+            )
+
+            if number_match is not None:
+                lexemes.append(
+                    _Lexeme(
+                        type=_LexemeType.OPERAND,
+                        position=position,
+                        token=ParsedToken(
+                            type=TokenType.NUMBER, value=float(number_match.group())
+                        ),
+                    )
+                )
+                position = number_match.end()
+                expect_operand = False
+            elif atom_match is not None:
+                lexemes.append(
+                    _Lexeme(
+                        type=_LexemeType.OPERAND,
+                        position=position,
+                        token=ParsedToken(type=TokenType.ATOM, value=atom_match),
+                    )
+                )
+                position += len(atom_match)
+                expect_operand = False
+            elif expression[position] == '(':
+                lexemes.append(_Lexeme(type=_LexemeType.LPAR, position=position))
+                position += 1
+            else:
+                raise ParseError(
+                    f'Expected a number, an atom or ( at char {position}, '
+                    f'found {expression[position:]!r}'
+                )
+        else:
+            if expression[position] in OPERATION_PRECEDENCES:
+                lexemes.append(
+                    _Lexeme(
+                        type=_LexemeType.OPERATION,
+                        position=position,
+                        token=ParsedToken(
+                            type=TokenType.ARITHMETIC_OPERATION,
+                            value=expression[position],
+                        ),
+                    )
+                )
+                expect_operand = True
+            elif expression[position] == ')':
+                lexemes.append(_Lexeme(type=_LexemeType.RPAR, position=position))
+            else:
+                raise ParseError(
+                    f'Expected an operation or ) at char {position}, '
+                    f'found {expression[position:]!r}'
+                )
+
+            position += 1
+
+    if expect_operand:
+        raise ParseError(
+            f'Expected a number, an atom or ( at char {position}, found end of text'
+        )
 
-    timeseries = pp.Or(atom_expressions).setParseAction(
-        lambda tokens: ParsedToken(type=TokenType.ATOM, value=tokens[0])
-    )
-    number = pp.Combine(
-        pp.Word(pp.nums) + pp.Optional(point + pp.Optional(pp.Word(pp.nums)))
-    ).setParseAction(
-        lambda tokens: ParsedToken(type=TokenType.NUMBER, value=float(tokens[0]))
-    )
+    return lexemes
 
-    expr = pp.Forward()
 
-    token = (number | timeseries).setParseAction(push_first)
-    atom = token | pp.Group(lpar + expr + rpar)
-    term = atom + pp.ZeroOrMore((mult_op + atom).setParseAction(push_first))
-    expr << term + pp.ZeroOrMore((add_op + term).setParseAction(push_first))
+def _parse_operand(lexemes: List[_Lexeme], index: int, stack: List[ParsedToken]) -> int:
+    lexeme = lexemes[index]
 
-    return expr
+    if lexeme.type is _LexemeType.OPERAND:
+        # operand and operation lexemes always have their tokens
+        assert lexeme.token is not None
+        stack.append(lexeme.token)
 
+        return index + 1
 
-def _parse_expression(
-    allow_unknown_atoms: bool, atom_names: List[str], expression: str
-) -> List[ParsedToken]:
+    # the tokenizer only puts operands and ( where an operand is expected
+    index = _parse_operations(lexemes, index + 1, 1, stack)
+    if index == len(lexemes) or lexemes[index].type is not _LexemeType.RPAR:
+        raise ParseError(f'Expected ) for ( at char {lexeme.position}')
+
+    return index + 1
+
+
+def _parse_operations(
+    lexemes: List[_Lexeme],
+    index: int,
+    min_precedence: int,
+    stack: List[ParsedToken],
+) -> int:
+    # precedence climbing, operations are left associative
+    index = _parse_operand(lexemes, index, stack)
+
+    while index < len(lexemes) and lexemes[index].type is _LexemeType.OPERATION:
+        operation = lexemes[index].token
+        assert operation is not None
+        precedence = OPERATION_PRECEDENCES[operation.value]
+        if precedence < min_precedence:
+            break
+
+        index = _parse_operations(lexemes, index + 1, precedence + 1, stack)
+        stack.append(operation)
+
+    return index
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_expression_cached(
+    allow_unknown_atoms: bool, atom_names: FrozenSet[str], expression: str
+) -> Union[Tuple[ParsedToken, ...], ParseError]:
     stack: List[ParsedToken] = []
-    grammar = make_expression_grammar(allow_unknown_atoms, atom_names, stack.append)
 
     try:
-        grammar.parseString(expression, parseAll=True)
-    except pp.ParseBaseException as exc:
+        lexemes = _tokenize(allow_unknown_atoms, atom_names, expression)
+        index = _parse_operations(lexemes, 0, 1, stack)
+        if index != len(lexemes):
+            raise ParseError(f'Unexpected ) at char {lexemes[index].position}')
+    except ParseError as exc:
         logger.error('Failed to parse expression=%s: %s', expression, exc)
 
-        raise ParseError(str(exc))
+        # failures are memoized as well, since atoms_get tries every atom
+        # against every dataset
+        return exc
 
-    return stack
+    return tuple(stack)
+
+
+def _parse_expression(
+    allow_unknown_atoms: bool, atom_names: FrozenSet[str], expression: str
+) -> List[ParsedToken]:
+    result = _parse_expression_cached(allow_unknown_atoms, atom_names, expression)
+    if isinstance(result, ParseError):
+        raise ParseError(str(result))
+
+    # the callers replace atoms with their own stacks
+    return list(result)
 
 
 def check_atom_name(name: str):
@@ -125,13 +286,12 @@ def _get_nested_stack(
     if cached_stack is not None:
         return cached_stack
 
-    atom_names = list(library.user_expressions) + library.basic_atoms
-    stack: List = _parse_expression(allow_unknown_atoms, atom_names, expression)
+    stack: List = _parse_expression(allow_unknown_atoms, library.atom_names, expression)
     for index, token in enumerate(stack):
         if token.type != TokenType.ATOM:
             continue
 
-        if token.value in library.basic_atoms:
+        if token.value in library.basic_atom_names:
             continue
 
         if allow_unknown_atoms and token.value not in library.user_expressions:
@@ -143,6 +303,8 @@ def _get_nested_stack(
             allow_unknown_atoms, library, atom_expression, cache
         )
 
+    cache[expression] = stack
+
     return stack
 
 
@@ -168,13 +330,68 @@ def get_dependencies(stack: List[ParsedToken]) -> Set[str]:
     return {token.value for token in stack if token.type is TokenType.ATOM}
 
 
+@dataclasses.dataclass
+class ResolvedAtom:
+    stack: List[ParsedToken]
+    basic_atoms: FrozenSet[str]
+
+
+def resolve_user_expressions(library: ExpressionLibrary) -> Dict[str, ResolvedAtom]:
+    # library.basic_atoms are the basic atoms of all of the datasets,
+    # an atom is available for the datasets having all of its basic atoms
+    stacks = {}
+    graph = nx.DiGraph()
+    for atom_name, expression in library.user_expressions.items():
+        try:
+            stacks[atom_name] = _parse_expression(
+                allow_unknown_atoms=False,
+                atom_names=library.atom_names,
+                expression=expression,
+            )
+        except ParseError:
+            continue
+
+        graph.add_node(atom_name)
+        for dep_atom_name in get_dependencies(stacks[atom_name]):
+            if dep_atom_name in library.user_expressions:
+                graph.add_edge(atom_name, dep_atom_name)
+
+    resolved_atoms: Dict[str, ResolvedAtom] = {}
+    # dependencies are resolved before the atoms using them
+    for atom_name in reversed(list(nx.topological_sort(graph))):
+        if atom_name not in stacks:
+            continue
+
+        stack: List[ParsedToken] = []
+        basic_atoms: Set[str] = set()
+        for token in stacks[atom_name]:
+            if token.type is not TokenType.ATOM:
+                stack.append(token)
+            elif token.value in library.user_expressions:
+                resolved_atom = resolved_atoms.get(token.value)
+                if resolved_atom is None:
+                    break
+
+                stack.extend(resolved_atom.stack)
+                basic_atoms.update(resolved_atom.basic_atoms)
+            else:
+                stack.append(token)
+                basic_atoms.add(token.value)
+        else:
+            resolved_atoms[atom_name] = ResolvedAtom(
+                stack=stack, basic_atoms=frozenset(basic_atoms)
+            )
+
+    return resolved_atoms
+
+
 def build_atom_graph(user_expressions: Dict[str, str]) -> nx.DiGraph:
     graph = nx.DiGraph()
 
     for atom_name, expression in user_expressions.items():
         stack = _parse_expression(
             allow_unknown_atoms=True,
-            atom_names=[],
+            atom_names=frozenset(),
             expression=expression,
         )
 
@@ -12,3 +12,14 @@ async def get_connection_pool():
         database=conn_data.dbname,
         host=conn_data.host,
     )
+
+
+async def get_connection() -> asyncpg.Connection:
+    conn_data = secdist.get_pg_conn_data()
+
+    return await asyncpg.connect(
+        user=conn_data.user,
+        password=conn_data.password,
+        database=conn_data.dbname,
+        host=conn_data.host,
+    )
@@ -1,10 +1,52 @@
+import asyncio
+import contextlib
+import logging
+from typing import AsyncIterator
+from typing import Dict
+from typing import FrozenSet
+from typing import Optional
+
 from aiohttp import web
 import asyncpg
-from typing import Dict
+import networkx as nx
 
+from cloud_validol.admin.lib import pg
+from cloud_validol.admin.lib.atoms import grammar as atom_grammar
 
-async def get_user_expressions(request: web.Request) -> Dict[str, str]:
-    async with request.app['pool'].acquire() as conn:
+
+logger = logging.getLogger(__name__)
+
+# notified by the validol_internal.atom triggers
+ATOM_CHANGED_CHANNEL = 'validol_atom_changed'
+LISTEN_RECONNECT_DELAY = 5.0
+
+
+class AtomLibrary:
+    def __init__(self, user_expressions: Dict[str, str]):
+        self.user_expressions = user_expressions
+        self.graph: nx.DiGraph = atom_grammar.build_atom_graph(user_expressions)
+        self._resolved_basic_atoms: Optional[FrozenSet[str]] = None
+        self._resolved_atoms: Dict[str, atom_grammar.ResolvedAtom] = {}
+
+    def resolve(
+        self, basic_atoms: FrozenSet[str]
+    ) -> Dict[str, atom_grammar.ResolvedAtom]:
+        # the basic atoms of superset datasets rarely change,
+        # so the latest resolution only is kept
+        if basic_atoms != self._resolved_basic_atoms:
+            self._resolved_atoms = atom_grammar.resolve_user_expressions(
+                atom_grammar.ExpressionLibrary(
+                    user_expressions=self.user_expressions,
+                    basic_atoms=sorted(basic_atoms),
+                )
+            )
+            self._resolved_basic_atoms = basic_atoms
+
+        return self._resolved_atoms
+
+
+async def _fetch_user_expressions(pool: asyncpg.pool.Pool) -> Dict[str, str]:
+    async with pool.acquire() as conn:
         rows = await conn.fetch(
             '''
             SELECT 
@@ -18,6 +60,101 @@ async def get_user_expressions(request: web.Request) -> Dict[str, str]:
     return {row['name']: row['expression'] for row in rows}
 
 
+class AtomLibraryCache:
+    def __init__(self, pool: asyncpg.pool.Pool):
+        self._pool = pool
+        self._library: Optional[AtomLibrary] = None
+        # bumped on every invalidation, so that a library fetched
+        # concurrently with a change isn't cached
+        self._version = 0
+        self._listening = False
+        self._reload_lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self._library = None
+        self._version += 1
+
+    async def get(self) -> AtomLibrary:
+        library = self._library
+        if library is not None:
+            return library
+
+        async with self._reload_lock:
+            if self._library is not None:
+                return self._library
+
+            version = self._version
+            library = AtomLibrary(await _fetch_user_expressions(self._pool))
+
+            # changes made by the other workers are only known while listening
+            if self._listening and version == self._version:
+                self._library = library
+
+        return library
+
+    def _on_notification(self, conn, pid, channel, payload) -> None:
+        logger.info('Atoms have changed, dropping the atom library cache')
+
+        self.invalidate()
+
+    async def listen(self) -> None:
+        while True:
+            conn = None
+            try:
+                conn = await pg.get_connection()
+
+                terminated = asyncio.Event()
+                conn.add_termination_listener(lambda _: terminated.set())
+                await conn.add_listener(ATOM_CHANGED_CHANNEL, self._on_notification)
+
+                # the atoms might have changed while nobody was listening
+                self.invalidate()
+                self._listening = True
+
+                await terminated.wait()
+                logger.error('Lost the atom notifications connection')
+            except asyncio.CancelledError:
+                # an Exception before python 3.8
+                raise
+            except Exception:
+                # the cache stays off until the next attempt, so any error is retried
+                logger.exception('Failed to listen to atom notifications')
+            finally:
+                self._listening = False
+                self.invalidate()
+
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+
+            await asyncio.sleep(LISTEN_RECONNECT_DELAY)
+
+
+async def _atom_library_ctx(app: web.Application) -> AsyncIterator[None]:
+    cache = AtomLibraryCache(app['pool'])
+    app['atom_library'] = cache
+
+    listen_task = asyncio.ensure_future(cache.listen())
+    yield
+
+    listen_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await listen_task
+
+
+def setup(app: web.Application) -> None:
+    app.cleanup_ctx.append(_atom_library_ctx)
+
+
+async def get_atom_library(request: web.Request) -> AtomLibrary:
+    return await request.app['atom_library'].get()
+
+
+async def get_user_expressions(request: web.Request) -> Dict[str, str]:
+    library = await get_atom_library(request)
+
+    return library.user_expressions
+
+
 async def insert_user_expression(
     request: web.Request, name: str, expression: str
 ) -> None:
@@ -36,6 +173,9 @@ async def insert_user_expression(
     except asyncpg.exceptions.UniqueViolationError:
         raise web.HTTPBadRequest(reason=f'Expression name={name} already exists')
 
+    # the notification arrives later, the writer sees its change right away
+    request.app['atom_library'].invalidate()
+
 
 async def delete_user_expression(request: web.Request, name: str) -> None:
     async with request.app['pool'].acquire() as conn:
@@ -48,6 +188,8 @@ async def delete_user_expression(request: web.Request, name: str) -> None:
             name,
         )
 
+    request.app['atom_library'].invalidate()
+
 
 async def update_user_expression(
     request: web.Request, name: str, expression: str
@@ -62,3 +204,5 @@ async def update_user_expression(
             name,
             expression,
         )
+
+    request.app['atom_library'].invalidate()
@@ -1,9 +1,48 @@
 from aiohttp import web
+from typing import AsyncIterator
 from typing import List
 
 from cloud_validol.admin.lib import superset
 
 
+async def _superset_client_ctx(app: web.Application) -> AsyncIterator[None]:
+    client = superset.SupersetClient()
+    app['superset'] = client
+    app['superset_datasets'] = superset.DatasetCache(client)
+
+    yield
+
+    await client.close()
+
+
+def setup(app: web.Application) -> None:
+    app.cleanup_ctx.append(_superset_client_ctx)
+
+
+def get_client(request: web.Request) -> superset.SupersetClient:
+    return request.app['superset']
+
+
+async def get_datasets(request: web.Request) -> List[superset.DatasetItemView]:
+    return await request.app['superset_datasets'].get_datasets()
+
+
+async def get_dataset(request: web.Request, pk: int) -> superset.DatasetItemView:
+    return await request.app['superset_datasets'].get_dataset(pk)
+
+
+async def push_dataset_columns(
+    request: web.Request, pk: int, columns: List[superset.ColumnExpression]
+) -> None:
+    try:
+        await superset.push_dataset_columns(
+            client=get_client(request), pk=pk, columns=columns
+        )
+    finally:
+        # a failed push might have reset the dataset columns already
+        request.app['superset_datasets'].invalidate(pk)
+
+
 def parse_dataset_columns(
     dataset: superset.DatasetItemView, user_atoms: List[str]
 ) -> superset.DatasetColumnsInfo:
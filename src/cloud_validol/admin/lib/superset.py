@@ -1,9 +1,11 @@
-import contextlib
+import asyncio
+import base64
 import copy
 import dataclasses
 import json
 import logging
-from typing import AsyncGenerator
+import time
+from typing import Any
 from typing import Dict
 from typing import List
 from typing import Optional
@@ -15,6 +17,14 @@ from cloud_validol.lib import secdist
 
 logger = logging.getLogger(__name__)
 
+MAX_CONCURRENT_REQUESTS = 8
+# used when the expiry time can't be read from the access token
+DEFAULT_TOKEN_TTL = 300.0
+TOKEN_EXPIRY_MARGIN = 30.0
+DATASETS_TTL = 60.0
+# leaves some of the client connections to the other handlers
+MAX_CONCURRENT_DATASET_FETCHES = 4
+
 
 class BaseError(Exception):
     pass
@@ -31,14 +41,46 @@ class BasicAtomCollision(ColumnError):
     pass
 
 
-@contextlib.asynccontextmanager
-async def superset_session() -> AsyncGenerator[aiohttp.ClientSession, None]:
-    conn_data = secdist.get_superset_conn_data()
+def _get_token_expires_at(token: str) -> float:
+    # access tokens are JWTs, their payload has the expiry time
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4))
+        )
+
+        return float(claims['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return time.time() + DEFAULT_TOKEN_TTL
+
+
+class SupersetClient:
+    def __init__(self, max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS):
+        self._max_concurrent_requests = max_concurrent_requests
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._auth_headers: Optional[Dict[str, str]] = None
+        self._auth_expires_at = 0.0
+        self._auth_lock = asyncio.Lock()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # created on first use, so that the backend starts without superset secdist
+        if self._session is None:
+            conn_data = secdist.get_superset_conn_data()
+            self._session = aiohttp.ClientSession(
+                conn_data.base_url,
+                connector=aiohttp.TCPConnector(limit=self._max_concurrent_requests),
+                # keeps the session cookie when superset is addressed by ip
+                cookie_jar=aiohttp.CookieJar(unsafe=True),
+            )
 
-    async with aiohttp.ClientSession(
-        conn_data.base_url, raise_for_status=True
-    ) as session:
-        response = await session.post(
+        return self._session
+
+    async def _login(self) -> Dict[str, str]:
+        conn_data = secdist.get_superset_conn_data()
+        session = self._get_session()
+
+        async with session.post(
             '/api/v1/security/login',
             json={
                 'password': conn_data.password,
@@ -46,26 +88,81 @@ async def superset_session() -> AsyncGenerator[aiohttp.ClientSession, None]:
                 'refresh': False,
                 'username': conn_data.user,
             },
-        )
+            raise_for_status=True,
+        ) as response:
+            response_json = await response.json()
+            token = response_json['access_token']
+
+        # the csrf token is bound to the session cookie superset sets here,
+        # which the session keeps in its cookie jar
+        async with session.get(
+            '/api/v1/security/csrf_token/',
+            headers={'Authorization': f'Bearer {token}'},
+            raise_for_status=True,
+        ) as response:
+            response_json = await response.json()
+
+        self._auth_expires_at = _get_token_expires_at(token) - TOKEN_EXPIRY_MARGIN
+
+        return {
+            'Authorization': f'Bearer {token}',
+            'X-CSRFToken': response_json['result'],
+        }
+
+    async def _get_auth_headers(
+        self, rejected_headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, str]:
+        async with self._auth_lock:
+            # the headers might have been refreshed by a concurrent request already
+            if (
+                self._auth_headers is None
+                or self._auth_headers is rejected_headers
+                or time.time() >= self._auth_expires_at
+            ):
+                logger.info('Logging in to superset')
+
+                self._auth_headers = await self._login()
+
+            return self._auth_headers
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> Any:
+        session = self._get_session()
+
+        async with self._semaphore:
+            auth_headers = await self._get_auth_headers()
+            async with session.request(
+                method, url, headers=auth_headers, **kwargs
+            ) as response:
+                if response.status != 401:
+                    response.raise_for_status()
+
+                    return await response.json(content_type=None)
 
-        response_json = await response.json()
-        token = response_json['access_token']
+            logger.info('Superset has rejected the access token, retrying')
 
-    async with aiohttp.ClientSession(
-        conn_data.base_url,
-        headers={'Authorization': f'Bearer {token}'},
-        raise_for_status=True,
-    ) as session:
-        response = await session.get('/api/v1/security/csrf_token/')
-        response_json = await response.json()
-        session.headers['X-CSRFToken'] = response_json['result']
+            auth_headers = await self._get_auth_headers(rejected_headers=auth_headers)
+            async with session.request(
+                method, url, headers=auth_headers, **kwargs
+            ) as response:
+                response.raise_for_status()
 
-        yield session
+                return await response.json(content_type=None)
+
+    async def get(self, url: str, **kwargs: Any) -> Any:
+        return await self.request('GET', url, **kwargs)
+
+    async def put(self, url: str, **kwargs: Any) -> Any:
+        return await self.request('PUT', url, **kwargs)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
 
 
 @dataclasses.dataclass(frozen=True)
 class DatasetListView:
     id: int
+    changed_on: Optional[str]
 
 
 @dataclasses.dataclass(frozen=True)
@@ -94,21 +191,21 @@ class ColumnExpression:
     expression: str
 
 
-async def get_datasets(session: aiohttp.ClientSession) -> List[DatasetListView]:
+async def get_datasets(client: SupersetClient) -> List[DatasetListView]:
     query = json.dumps({'page': 0, 'page_size': 100})
-    response = await session.get('/api/v1/dataset/', params={'q': query})
-    response_json = await response.json()
+    response_json = await client.get('/api/v1/dataset/', params={'q': query})
 
     result = []
     for dataset in response_json['result']:
-        result.append(DatasetListView(id=dataset['id']))
+        result.append(
+            DatasetListView(id=dataset['id'], changed_on=dataset.get('changed_on_utc'))
+        )
 
     return result
 
 
-async def get_dataset(session: aiohttp.ClientSession, pk: int) -> DatasetItemView:
-    response = await session.get(f'/api/v1/dataset/{pk}')
-    response_json = await response.json()
+async def get_dataset(client: SupersetClient, pk: int) -> DatasetItemView:
+    response_json = await client.get(f'/api/v1/dataset/{pk}')
     response_result = response_json['result']
 
     columns = []
@@ -128,6 +225,103 @@ async def get_dataset(session: aiohttp.ClientSession, pk: int) -> DatasetItemVie
     )
 
 
+@dataclasses.dataclass(frozen=True)
+class _CachedDataset:
+    changed_on: Optional[str]
+    dataset: DatasetItemView
+
+
+class DatasetCache:
+    def __init__(
+        self,
+        client: SupersetClient,
+        ttl: float = DATASETS_TTL,
+        max_concurrent_fetches: int = MAX_CONCURRENT_DATASET_FETCHES,
+    ):
+        self._client = client
+        self._ttl = ttl
+        self._fetch_semaphore = asyncio.Semaphore(max_concurrent_fetches)
+        self._datasets: Dict[int, _CachedDataset] = {}
+        self._dataset_ids: List[int] = []
+        self._expires_at = 0.0
+        # bumped on every invalidation, so that datasets fetched
+        # concurrently with a push aren't cached
+        self._version = 0
+        self._refresh_lock = asyncio.Lock()
+
+    def invalidate(self, pk: int) -> None:
+        self._datasets.pop(pk, None)
+        self._expires_at = 0.0
+        self._version += 1
+
+    def _get_cached_datasets(self) -> Optional[List[DatasetItemView]]:
+        if time.monotonic() >= self._expires_at:
+            return None
+
+        return [self._datasets[pk].dataset for pk in self._dataset_ids]
+
+    async def _fetch_dataset(self, pk: int) -> DatasetItemView:
+        async with self._fetch_semaphore:
+            return await get_dataset(self._client, pk)
+
+    async def get_datasets(self) -> List[DatasetItemView]:
+        datasets = self._get_cached_datasets()
+        if datasets is not None:
+            return datasets
+
+        async with self._refresh_lock:
+            datasets = self._get_cached_datasets()
+            if datasets is not None:
+                return datasets
+
+            version = self._version
+            listed_datasets = await get_datasets(self._client)
+
+            # a snapshot, since a push may invalidate the cache while fetching
+            datasets_by_id: Dict[int, _CachedDataset] = {}
+            stale_datasets = []
+            for listed_dataset in listed_datasets:
+                cached_dataset = self._datasets.get(listed_dataset.id)
+                if (
+                    cached_dataset is None
+                    or listed_dataset.changed_on is None
+                    or cached_dataset.changed_on != listed_dataset.changed_on
+                ):
+                    # only the datasets changed since they were cached are fetched
+                    stale_datasets.append(listed_dataset)
+                else:
+                    datasets_by_id[listed_dataset.id] = cached_dataset
+
+            logger.info(
+                'Fetching %s of %s superset datasets',
+                len(stale_datasets),
+                len(listed_datasets),
+            )
+
+            fetched_datasets = await asyncio.gather(
+                *[self._fetch_dataset(dataset.id) for dataset in stale_datasets]
+            )
+            for listed_dataset, dataset in zip(stale_datasets, fetched_datasets):
+                datasets_by_id[listed_dataset.id] = _CachedDataset(
+                    changed_on=listed_dataset.changed_on, dataset=dataset
+                )
+            dataset_ids = [dataset.id for dataset in listed_datasets]
+
+            if version == self._version:
+                self._datasets = datasets_by_id
+                self._dataset_ids = dataset_ids
+                self._expires_at = time.monotonic() + self._ttl
+
+            return [datasets_by_id[pk].dataset for pk in dataset_ids]
+
+    async def get_dataset(self, pk: int) -> DatasetItemView:
+        cached_dataset = self._datasets.get(pk)
+        if cached_dataset is not None and time.monotonic() < self._expires_at:
+            return cached_dataset.dataset
+
+        return await self._fetch_dataset(pk)
+
+
 def parse_dataset_columns(
     dataset: DatasetItemView, user_atoms: List[str]
 ) -> DatasetColumnsInfo:
@@ -148,12 +342,11 @@ def parse_dataset_columns(
 
 
 async def push_dataset_columns(
-    session: aiohttp.ClientSession,
+    client: SupersetClient,
     pk: int,
     columns: List[ColumnExpression],
 ) -> None:
-    response = await session.get(f'/api/v1/dataset/{pk}')
-    response_json = await response.json()
+    response_json = await client.get(f'/api/v1/dataset/{pk}')
 
     update_request = copy.deepcopy(response_json['result'])
 
@@ -209,12 +402,12 @@ async def push_dataset_columns(
         }
     ]
 
-    await session.put(
+    await client.put(
         f'/api/v1/dataset/{pk}',
         json=reset_request,
     )
 
-    await session.put(
+    await client.put(
         f'/api/v1/dataset/{pk}',
         json=update_request,
     )
@@ -13,7 +13,9 @@ from cloud_validol.admin.handlers import series_get
 from cloud_validol.admin.handlers import series_update_start_post
 from cloud_validol.admin.handlers import series_update_poll_get
 from cloud_validol.admin.lib import pg
+from cloud_validol.admin.lib.server import atoms as server_atoms
 from cloud_validol.admin.lib.server import jobs
+from cloud_validol.admin.lib.server import superset as server_superset
 
 
 logging.basicConfig(level=logging.DEBUG)
@@ -40,6 +42,8 @@ async def init_app():
     )
 
     jobs.setup(app)
+    server_atoms.setup(app)
+    server_superset.setup(app)
 
     return app
 
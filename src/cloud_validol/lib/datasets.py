@@ -1,4 +1,9 @@
-SCHEMA = [
+from typing import Any
+from typing import Dict
+from typing import List
+
+
+SCHEMA: List[Dict[str, Any]] = [
     {
         'name': 'fredgraph',
         'dimension_columns': [],
@@ -24,6 +29,10 @@ SCHEMA = [
     },
     {
         'name': 'cot_futures_only',
+        # cot_futures_only_index scans the whole data table to filter out foreign series
+        'index_view': 'cot_derivatives_index',
+        # validol_internal.<name>_data is range-partitioned by year of event_dttm
+        'partitioned_from_year': 1986,
         'index_columns': [
             'platform_source',
             'platform_code',
@@ -53,6 +62,10 @@ SCHEMA = [
     },
     {
         'name': 'cot_disaggregated',
+        # cot_disaggregated_index scans the whole data table to filter out foreign series
+        'index_view': 'cot_derivatives_index',
+        # validol_internal.<name>_data is range-partitioned by year of event_dttm
+        'partitioned_from_year': 1986,
         'index_columns': [
             'platform_source',
             'platform_code',
@@ -97,6 +110,10 @@ SCHEMA = [
     },
     {
         'name': 'cot_financial_futures',
+        # cot_financial_futures_index scans the whole data table to filter out foreign series
+        'index_view': 'cot_derivatives_index',
+        # validol_internal.<name>_data is range-partitioned by year of event_dttm
+        'partitioned_from_year': 1986,
         'index_columns': [
             'platform_source',
             'platform_code',
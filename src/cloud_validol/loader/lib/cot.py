@@ -2,19 +2,28 @@ import dataclasses
 import datetime as dt
 import logging
 from typing import Any
+from typing import Callable
 from typing import Dict
 from typing import List
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 import psycopg2
-import pytz
 import sqlalchemy
 
+from cloud_validol.loader.lib import load_state
 from cloud_validol.loader.lib import pg
 
 logger = logging.getLogger(__name__)
 
+# nullable, since some of the reports have gaps in positions
+POSITIONS_DTYPE = 'Int32'
+# parsing straight into a nullable dtype is several times slower than into floats
+POSITIONS_READ_DTYPE = 'float64'
+PERCENTS_DTYPE = 'float32'
+PERCENTS_SUFFIX = '_percent'
+
 
 @dataclasses.dataclass
 class DerivativeConfig:
@@ -39,20 +48,7 @@ class UpdateInterval:
 def get_interval(
     engine: sqlalchemy.engine.base.Engine, config: DerivativeConfig
 ) -> Optional[UpdateInterval]:
-    df = pd.read_sql(
-        f'''
-            SELECT 
-                MAX(DATE(data.event_dttm)) AS last_event_dt
-            FROM validol_internal.{config.table_name} AS data
-            INNER JOIN validol_interface.cot_derivatives_index AS index
-                ON data.series_id = index.series_id
-            WHERE index.report_type = %(report_type)s AND index.platform_source = %(platform_source)s
-        ''',
-        engine,
-        params={'report_type': config.report_type, 'platform_source': config.source},
-    )
-
-    last_event_dt = df.iloc[0].last_event_dt
+    last_event_dt = load_state.get_last_event_dt(engine, config.source)
     today = dt.date.today()
 
     if last_event_dt is None:
@@ -80,22 +76,53 @@ def get_interval(
     )
 
 
+def get_usecols(config: DerivativeConfig) -> List[str]:
+    return [
+        config.platform_code_col,
+        config.derivative_name_col,
+        config.date_col,
+    ] + list(config.data_cols)
+
+
+def get_dtypes(config: DerivativeConfig) -> Dict[str, str]:
+    return {
+        config.platform_code_col: 'category',
+        config.derivative_name_col: 'category',
+        config.date_col: 'str',
+        **{
+            column: PERCENTS_DTYPE
+            if data_col.endswith(PERCENTS_SUFFIX)
+            else POSITIONS_READ_DTYPE
+            for column, data_col in config.data_cols.items()
+        },
+    }
+
+
+def _map_categories(
+    series: pd.Series, func: Callable[[pd.Series], pd.Series]
+) -> pd.Series:
+    # only the distinct values are transformed instead of every row
+    series = series.astype('category')
+    codes, categories = pd.factorize(func(series.cat.categories.to_series()))
+
+    # missing values have code -1, which picks the appended -1
+    return pd.Series(
+        pd.Categorical.from_codes(np.append(codes, -1)[series.cat.codes], categories),
+        index=series.index,
+    )
+
+
 def process_raw_dataframe(
     config: DerivativeConfig,
     date_format: str,
     raw_df: pd.DataFrame,
 ) -> pd.DataFrame:
-    usecols = [
-        config.platform_code_col,
-        config.derivative_name_col,
-        config.date_col,
-    ] + list(config.data_cols)
-    raw_df = raw_df[usecols]
+    raw_df = raw_df[get_usecols(config)]
 
     raw_df = raw_df.assign(
         **{
-            config.date_col: raw_df[config.date_col].map(
-                lambda x: dt.datetime.strptime(x, date_format).replace(tzinfo=pytz.UTC)
+            config.date_col: pd.to_datetime(
+                raw_df[config.date_col], format=date_format, utc=True
             )
         }
     )
@@ -110,33 +137,37 @@ def process_raw_dataframe(
         }
     )
 
-    raw_df.platform_code = [x.strip() for x in raw_df.platform_code]
-
-    platform_names = []
-    derivative_names = []
-    for derivative_dash_platform in raw_df[config.derivative_name_col]:
-        derivative_name, platform_name = derivative_dash_platform.rsplit('-', 1)
-        platform_names.append(platform_name.strip())
-        derivative_names.append(derivative_name.strip())
+    raw_df['platform_code'] = _map_categories(
+        raw_df['platform_code'], lambda x: x.str.strip()
+    )
 
-    raw_df['platform_name'] = platform_names
-    raw_df['derivative_name'] = derivative_names
+    derivative_dash_platform = raw_df[config.derivative_name_col]
+    raw_df['platform_name'] = _map_categories(
+        derivative_dash_platform, lambda x: x.str.rsplit('-', n=1).str[1].str.strip()
+    )
+    raw_df['derivative_name'] = _map_categories(
+        derivative_dash_platform, lambda x: x.str.rsplit('-', n=1).str[0].str.strip()
+    )
 
     del raw_df[config.derivative_name_col]
 
-    return raw_df
+    return raw_df.astype(
+        {
+            data_col: POSITIONS_DTYPE
+            for data_col in config.data_cols.values()
+            if not data_col.endswith(PERCENTS_SUFFIX)
+        }
+    )
 
 
 def insert_platforms_derivatives(
     conn: psycopg2.extensions.connection, config: DerivativeConfig, df: pd.DataFrame
 ):
-    derivatives = set()
-    platforms = {}
-    for _, row in df.iterrows():
-        derivatives.add((row.platform_code, row.derivative_name))
-        platforms[row.platform_code] = row.platform_name
-
-    platform_codes, platform_names = zip(*platforms.items())
+    derivative_keys = ['platform_code', 'derivative_name']
+    derivatives = df[derivative_keys].drop_duplicates()
+    platforms = df[['platform_code', 'platform_name']].drop_duplicates(
+        'platform_code', keep='last'
+    )
 
     with conn.cursor() as cursor:
         cursor.execute(
@@ -147,16 +178,16 @@ def insert_platforms_derivatives(
                 name = EXCLUDED.name
             RETURNING id
         ''',
-            (config.source, list(platform_codes), list(platform_names)),
+            (
+                config.source,
+                platforms.platform_code.tolist(),
+                platforms.platform_name.tolist(),
+            ),
         )
-        platform_ids = dict(zip(platform_codes, pg.extract_ids_from_cursor(cursor)))
-
-        derivative_platform_ids, derivative_names = zip(
-            *[
-                (platform_ids[platform_code], derivative_name)
-                for platform_code, derivative_name in derivatives
-            ]
+        platform_ids = dict(
+            zip(platforms.platform_code, pg.extract_ids_from_cursor(cursor))
         )
+
         cursor.execute(
             '''
             INSERT INTO validol_internal.cot_derivatives_info (cot_derivatives_platform_id, name, report_type)
@@ -165,31 +196,49 @@ def insert_platforms_derivatives(
                 name = EXCLUDED.name
             RETURNING id
         ''',
-            (list(derivative_platform_ids), list(derivative_names), config.report_type),
+            (
+                # a categorical would map its unused categories to NaN, making ids floats
+                derivatives.platform_code.astype(object).map(platform_ids).tolist(),
+                derivatives.derivative_name.tolist(),
+                config.report_type,
+            ),
         )
-
-        derivative_ids = dict(zip(derivatives, pg.extract_ids_from_cursor(cursor)))
+        derivatives = derivatives.assign(series_id=pg.extract_ids_from_cursor(cursor))
 
     conn.commit()
 
-    df['series_id'] = [
-        derivative_ids[row.platform_code, row.derivative_name]
-        for _, row in df.iterrows()
-    ]
+    df['series_id'] = (
+        df[derivative_keys]
+        .merge(derivatives, how='left', on=derivative_keys)
+        .series_id.values
+    )
 
 
 def insert_data(
-    engine: sqlalchemy.engine.base.Engine, config: DerivativeConfig, df: pd.DataFrame
-):
+    conn: psycopg2.extensions.connection,
+    config: DerivativeConfig,
+    df: pd.DataFrame,
+    save_load_state: bool = True,
+) -> int:
     for column in ['platform_code', 'platform_name', 'derivative_name']:
         del df[column]
 
-    df.to_sql(
-        config.table_name,
-        engine,
-        schema='validol_internal',
-        index=False,
-        if_exists='append',
-        method=pg.insert_on_conflict_do_nothing,
-        chunksize=10000,
-    )
+    partitions = set(pg.get_partitions(conn, config.table_name))
+    inserted_rows = 0
+    for year, year_df in df.groupby(df.event_dttm.dt.year):
+        # writing to a partition directly saves routing every row
+        table_name = f'{config.table_name}_{year}'
+        if table_name not in partitions:
+            table_name = config.table_name
+
+        inserted_rows += pg.copy_insert(
+            conn, table_name, year_df, on_conflict_do_nothing=True
+        )
+
+    if save_load_state and not df.empty:
+        load_state.update(
+            conn, config.source, df.event_dttm.max().date(), inserted_rows
+        )
+    conn.commit()
+
+    return inserted_rows
@@ -0,0 +1,231 @@
+import dataclasses
+import datetime as dt
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'cloud_validol')
+DEFAULT_MAX_SIZE = 10 * 1024**3
+# reports are still being amended for a while after their period is over
+SETTLE_PERIOD = dt.timedelta(days=30)
+CHUNK_SIZE = 1024**2
+
+
+class BaseError(Exception):
+    pass
+
+
+class OfflineCacheMiss(BaseError):
+    def __init__(self, url):
+        super().__init__(f'{url} is not cached, can\'t download it in offline mode')
+
+        self.url = url
+
+
+@dataclasses.dataclass
+class CacheSettings:
+    path: str
+    max_size: int
+    offline: bool
+
+
+_settings: Optional[CacheSettings] = None
+_eviction_lock = threading.Lock()
+# bodies handed out in this run, the loaders may read them long after the fetch
+_pinned_paths: Set[str] = set()
+
+
+def get_settings() -> CacheSettings:
+    global _settings
+
+    if _settings is None:
+        _settings = CacheSettings(
+            path=os.environ.get('VALIDOL_CACHE_DIR', DEFAULT_CACHE_DIR),
+            max_size=int(os.environ.get('VALIDOL_CACHE_MAX_SIZE', DEFAULT_MAX_SIZE)),
+            offline=os.environ.get('VALIDOL_OFFLINE', '') == '1',
+        )
+
+    return _settings
+
+
+def configure(**kwargs: Any) -> None:
+    global _settings
+
+    _settings = dataclasses.replace(get_settings(), **kwargs)
+
+    with _eviction_lock:
+        _pinned_paths.clear()
+
+
+def is_settled(last_date: dt.date) -> bool:
+    return last_date < dt.date.today() - SETTLE_PERIOD
+
+
+def _get_paths(
+    settings: CacheSettings, url: str, params: Optional[Dict[str, str]]
+) -> Tuple[str, str]:
+    full_url = requests.Request('GET', url, params=params).prepare().url
+    # a prepared request always has its url set
+    assert full_url is not None
+    key = hashlib.sha256(full_url.encode('utf-8')).hexdigest()
+
+    return (
+        os.path.join(settings.path, f'{key}.body'),
+        os.path.join(settings.path, f'{key}.json'),
+    )
+
+
+def _read_meta(body_path: str, meta_path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.isfile(body_path):
+        return None
+
+    try:
+        with open(meta_path) as infile:
+            return json.load(infile)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path: str, meta: Dict[str, Any]) -> None:
+    with tempfile.NamedTemporaryFile(
+        'w', dir=os.path.dirname(meta_path), delete=False
+    ) as outfile:
+        json.dump(meta, outfile)
+
+    os.replace(outfile.name, meta_path)
+
+
+def _pin(body_path: str) -> str:
+    with _eviction_lock:
+        _pinned_paths.add(body_path)
+
+    return body_path
+
+
+def _evict(settings: CacheSettings) -> None:
+    # the cache may stay above its size until the run is over,
+    # the bodies of the current run are never evicted
+    with _eviction_lock:
+        entries = []
+        total_size = 0
+        for entry in os.scandir(settings.path):
+            if not entry.name.endswith('.body') or entry.path in _pinned_paths:
+                continue
+
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total_size += stat.st_size
+
+        for _, size, body_path in sorted(entries):
+            if total_size <= settings.max_size:
+                break
+
+            logger.info('Evicting %s from download cache', body_path)
+
+            for path in [body_path, body_path[: -len('.body')] + '.json']:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+            total_size -= size
+
+
+def is_cached(url: str, params: Optional[Dict[str, str]] = None) -> bool:
+    settings = get_settings()
+    meta = _read_meta(*_get_paths(settings, url, params))
+
+    return meta is not None and (meta['immutable'] or settings.offline)
+
+
+def fetch(
+    url: str,
+    params: Optional[Dict[str, str]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    immutable: bool = False,
+) -> Optional[str]:
+    settings = get_settings()
+    os.makedirs(settings.path, exist_ok=True)
+
+    body_path, meta_path = _get_paths(settings, url, params)
+    meta = _read_meta(body_path, meta_path)
+
+    if meta is not None and (meta['immutable'] or settings.offline):
+        logger.debug('Using cached %s', url)
+        os.utime(body_path)
+
+        return _pin(body_path)
+
+    if settings.offline:
+        raise OfflineCacheMiss(url)
+
+    request_headers = dict(headers or {})
+    if meta is not None:
+        if meta['etag'] is not None:
+            request_headers['If-None-Match'] = meta['etag']
+        if meta['last_modified'] is not None:
+            request_headers['If-Modified-Since'] = meta['last_modified']
+
+    with requests.get(
+        url, params=params, headers=request_headers, stream=True
+    ) as response:
+        if response.status_code == 304 and meta is not None:
+            logger.debug('Cached %s is not modified', url)
+            os.utime(body_path)
+
+            return _pin(body_path)
+
+        if response.status_code == 404:
+            return None
+
+        response.raise_for_status()
+
+        content_hash = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=settings.path, delete=False) as outfile:
+            try:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    content_hash.update(chunk)
+                    outfile.write(chunk)
+            except BaseException:
+                os.remove(outfile.name)
+                raise
+
+        new_meta = {
+            'url': response.url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'sha256': content_hash.hexdigest(),
+            'immutable': immutable,
+        }
+
+    # pinned before it's written, so that a concurrent eviction skips it
+    _pin(body_path)
+
+    body_changed = meta is None or meta['sha256'] != new_meta['sha256']
+    if body_changed:
+        os.replace(outfile.name, body_path)
+    else:
+        # servers without conditional requests resend the same reports
+        logger.debug('Downloaded %s is the same as the cached one', url)
+        os.remove(outfile.name)
+        os.utime(body_path)
+
+    if new_meta != meta:
+        _write_meta(meta_path, new_meta)
+
+    if body_changed:
+        _evict(settings)
+
+    return body_path
@@ -1,12 +1,17 @@
 import datetime as dt
 import logging
+from typing import Dict
 from typing import Optional
 from typing import Tuple
 
+import sqlalchemy
+
+from cloud_validol.loader.lib import load_state
+
 logger = logging.getLogger(__name__)
 
 
-def get_interval(
+def make_interval(
     interval_slug: str, last_event_dt: Optional[dt.date], global_from: dt.date
 ) -> Optional[Tuple[dt.date, dt.date]]:
     to_date = dt.date.today()
@@ -27,3 +32,30 @@ def get_interval(
     )
 
     return from_date, to_date
+
+
+def get_interval(
+    engine: sqlalchemy.engine.base.Engine, source: str, global_from: dt.date
+) -> Optional[Tuple[dt.date, dt.date]]:
+    last_event_dt = load_state.get_last_event_dt(engine, source)
+
+    return make_interval(source, last_event_dt, global_from)
+
+
+def get_series_intervals(
+    engine: sqlalchemy.engine.base.Engine,
+    source: str,
+    series_slugs: Dict[int, str],
+    global_from: dt.date,
+) -> Dict[int, Tuple[dt.date, dt.date]]:
+    last_event_dts = load_state.get_series_last_event_dts(engine, source)
+
+    result = {}
+    for series_id, interval_slug in series_slugs.items():
+        interval = make_interval(
+            interval_slug, last_event_dts.get(series_id), global_from
+        )
+        if interval is not None:
+            result[series_id] = interval
+
+    return result
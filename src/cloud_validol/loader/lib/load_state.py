@@ -0,0 +1,69 @@
+import datetime as dt
+from typing import Dict
+from typing import Optional
+
+import pandas as pd
+import psycopg2
+import sqlalchemy
+
+# series_id of the state kept for a source as a whole
+SOURCE_SERIES_ID = 0
+
+
+def get_last_event_dt(
+    engine: sqlalchemy.engine.base.Engine,
+    source: str,
+    series_id: int = SOURCE_SERIES_ID,
+) -> Optional[dt.date]:
+    df = pd.read_sql(
+        '''
+        SELECT last_event_dt
+        FROM validol_internal.load_state
+        WHERE source = %(source)s AND series_id = %(series_id)s
+    ''',
+        engine,
+        params={'source': source, 'series_id': series_id},
+    )
+
+    if df.empty:
+        return None
+
+    return df.iloc[0].last_event_dt
+
+
+def get_series_last_event_dts(
+    engine: sqlalchemy.engine.base.Engine, source: str
+) -> Dict[int, dt.date]:
+    df = pd.read_sql(
+        '''
+        SELECT series_id, last_event_dt
+        FROM validol_internal.load_state
+        WHERE source = %(source)s AND series_id != %(series_id)s
+    ''',
+        engine,
+        params={'source': source, 'series_id': SOURCE_SERIES_ID},
+    )
+
+    return dict(zip(df.series_id, df.last_event_dt))
+
+
+def update(
+    conn: psycopg2.extensions.connection,
+    source: str,
+    last_event_dt: dt.date,
+    rows_written: int,
+    series_id: int = SOURCE_SERIES_ID,
+):
+    # doesn't commit, so that the state is saved along with the data it describes
+    with conn.cursor() as cursor:
+        cursor.execute(
+            '''
+            INSERT INTO validol_internal.load_state (source, series_id, last_event_dt, rows_written)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (source, series_id) DO UPDATE SET
+                last_event_dt = GREATEST(load_state.last_event_dt, EXCLUDED.last_event_dt),
+                last_run_at = NOW(),
+                rows_written = load_state.rows_written + EXCLUDED.rows_written
+        ''',
+            (source, series_id, last_event_dt, rows_written),
+        )
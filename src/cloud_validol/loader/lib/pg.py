@@ -1,14 +1,19 @@
-from typing import Any
+import io
 from typing import Iterable
 from typing import List
+from typing import Optional
 from typing import Tuple
 
+import asyncpg
 import pandas as pd
 import psycopg2
+import psycopg2.pool
 import sqlalchemy
 
 from cloud_validol.lib import secdist
 
+COPY_CHUNKSIZE = 100000
+
 
 def get_engine() -> sqlalchemy.engine.base.Engine:
     conn_data = secdist.get_pg_conn_data()
@@ -31,17 +36,112 @@ def get_connection() -> psycopg2.extensions.connection:
     )
 
 
-def insert_on_conflict_do_nothing(
-    table: pd.io.sql.SQLTable,
-    conn: sqlalchemy.engine.base.Connection,
-    keys: List[str],
-    data_iter: Iterable[Iterable[Any]],
-):
-    data = [dict(zip(keys, row)) for row in data_iter]
-    insert_stmt = sqlalchemy.dialects.postgresql.insert(
-        table.table, values=data, bind=conn
-    ).on_conflict_do_nothing()
-    conn.execute(insert_stmt)
+def get_connection_pool(maxconn: int) -> psycopg2.pool.ThreadedConnectionPool:
+    conn_data = secdist.get_pg_conn_data()
+
+    return psycopg2.pool.ThreadedConnectionPool(
+        minconn=1,
+        maxconn=maxconn,
+        user=conn_data.user,
+        password=conn_data.password,
+        dbname=conn_data.dbname,
+        host=conn_data.host,
+    )
+
+
+def get_async_connection_pool(max_size: int) -> asyncpg.pool.Pool:
+    conn_data = secdist.get_pg_conn_data()
+
+    return asyncpg.create_pool(
+        user=conn_data.user,
+        password=conn_data.password,
+        database=conn_data.dbname,
+        host=conn_data.host,
+        min_size=1,
+        max_size=max_size,
+    )
+
+
+def copy_insert(
+    conn: psycopg2.extensions.connection,
+    table_name: str,
+    df: pd.DataFrame,
+    on_conflict_do_nothing: bool = False,
+    schema: str = 'validol_internal',
+    chunksize: int = COPY_CHUNKSIZE,
+    on_conflict_do_update: Optional[List[str]] = None,
+) -> int:
+    columns = ', '.join(df.columns)
+    staging_table_name = f'{table_name}_staging'
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f'''
+            CREATE TEMPORARY TABLE {staging_table_name} AS
+            SELECT {columns} FROM {schema}.{table_name}
+            WITH NO DATA
+        '''
+        )
+
+        for start in range(0, len(df), chunksize):
+            csv_buff = io.StringIO()
+            df.iloc[start : start + chunksize].to_csv(
+                csv_buff, index=False, header=False
+            )
+            csv_buff.seek(0)
+
+            cursor.copy_expert(
+                f'COPY {staging_table_name} ({columns}) FROM STDIN WITH (FORMAT csv)',
+                csv_buff,
+            )
+
+        on_conflict = 'ON CONFLICT DO NOTHING' if on_conflict_do_nothing else ''
+        if on_conflict_do_update is not None:
+            update_columns = [
+                column for column in df.columns if column not in on_conflict_do_update
+            ]
+            # only the rows which have actually changed are updated, a new id
+            # moves them above the watermarks of the serving tables
+            on_conflict = f'''
+                ON CONFLICT ({', '.join(on_conflict_do_update)}) DO UPDATE SET
+                    {', '.join(f'{column} = EXCLUDED.{column}' for column in update_columns)},
+                    id = DEFAULT
+                WHERE ({', '.join(f'{table_name}.{column}' for column in update_columns)})
+                    IS DISTINCT FROM ({', '.join(f'EXCLUDED.{column}' for column in update_columns)})
+            '''
+
+        cursor.execute(
+            f'''
+            INSERT INTO {schema}.{table_name} ({columns})
+            SELECT {columns} FROM {staging_table_name}
+            {on_conflict}
+        '''
+        )
+        inserted_rows = cursor.rowcount
+
+        cursor.execute(f'DROP TABLE {staging_table_name}')
+
+    return inserted_rows
+
+
+def get_partitions(
+    conn: psycopg2.extensions.connection,
+    table_name: str,
+    schema: str = 'validol_internal',
+) -> List[str]:
+    with conn.cursor() as cursor:
+        cursor.execute(
+            '''
+            SELECT partition.relname
+            FROM pg_catalog.pg_inherits AS inherits
+            INNER JOIN pg_catalog.pg_class AS partition
+                ON partition.oid = inherits.inhrelid
+            WHERE inherits.inhparent = %s::regclass
+        ''',
+            (f'{schema}.{table_name}',),
+        )
+
+        return [relname for relname, in cursor]
 
 
 def extract_ids_from_cursor(cursor: Iterable[Tuple[int]]):
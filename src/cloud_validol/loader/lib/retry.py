@@ -0,0 +1,39 @@
+import logging
+import random
+import time
+from typing import Callable
+from typing import Tuple
+from typing import Type
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+def call_with_retries(
+    func: Callable[..., T],
+    *args,
+    attempts: int,
+    backoff: float,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+    **kwargs,
+) -> T:
+    for attempt in range(attempts):
+        try:
+            return func(*args, **kwargs)
+        except retry_on as exc:
+            if attempt + 1 == attempts:
+                raise
+
+            delay = backoff * 2**attempt + random.uniform(0, backoff)
+            logger.warning(
+                'Attempt %s of %s failed: %s, retrying in %.1fs',
+                attempt + 1,
+                attempts,
+                exc,
+                delay,
+            )
+            time.sleep(delay)
+
+    raise ValueError(f'attempts must be positive, got {attempts}')
@@ -1,7 +1,17 @@
+import collections
+from concurrent import futures
 import logging
+import time
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Tuple
 
 import click
+import psycopg2.pool
+import sqlalchemy
 
+from cloud_validol.loader.lib import download_cache
 from cloud_validol.loader.lib import pg
 from cloud_validol.loader.reports import prices
 from cloud_validol.loader.reports import monetary
@@ -12,7 +22,7 @@ from cloud_validol.loader.reports import refresh_views
 
 logger = logging.getLogger(__name__)
 
-UPDATE_SOURCES = {
+UPDATE_SOURCES: Dict[str, Callable[..., Optional[Dict[str, int]]]] = {
     'prices': prices.update,
     'monetary': monetary.update,
     'moex': moex.update,
@@ -20,25 +30,108 @@ UPDATE_SOURCES = {
     'ice': ice.update,
     'views': refresh_views.update,
 }
+# these sources depend on the data ones and are run after all of them have finished
+FINAL_SOURCES = ['views']
+
+
+def _run_source(
+    engine: sqlalchemy.engine.base.Engine,
+    conn_pool: psycopg2.pool.ThreadedConnectionPool,
+    source: str,
+    written_rows: Optional[Dict[str, int]] = None,
+) -> Tuple[float, Dict[str, int]]:
+    started_at = time.monotonic()
+
+    kwargs = {} if source not in FINAL_SOURCES else {'written_rows': written_rows}
+    conn = conn_pool.getconn()
+    try:
+        source_written_rows = UPDATE_SOURCES[source](engine, conn, **kwargs)
+    finally:
+        conn_pool.putconn(conn)
+
+    return time.monotonic() - started_at, source_written_rows or {}
 
 
 @click.command()
 @click.option('--source', '-s', multiple=True, default=UPDATE_SOURCES.keys())
-def main(source):
+@click.option(
+    '--offline',
+    is_flag=True,
+    help='Process previously downloaded reports from the cache only',
+)
+@click.option(
+    '--parallel',
+    '-p',
+    type=click.IntRange(1),
+    default=1,
+    show_default=True,
+    help='Number of sources to update concurrently',
+)
+def main(source, offline, parallel):
     logging.basicConfig(
         format='%(asctime)s %(levelname)s:%(message)s',
         level=logging.DEBUG,
         datefmt='[%Y-%m-%d %H:%M:%S]',
     )
 
+    if offline:
+        download_cache.configure(offline=True)
+
+    sources = []
+    for s in source:
+        if s in UPDATE_SOURCES:
+            sources.append(s)
+        else:
+            logger.error('Passed nonexistent source to cli: %s', s)
+
+    stages = [
+        [s for s in sources if s not in FINAL_SOURCES],
+        [s for s in sources if s in FINAL_SOURCES],
+    ]
+
     engine = pg.get_engine()
+    conn_pool = pg.get_connection_pool(maxconn=parallel)
+
+    durations: Dict[str, Optional[float]] = {}
+    written_rows: Optional[Dict[str, int]] = collections.Counter()
+    if not stages[0]:
+        # the final sources are run on their own, so nothing is known about changes
+        written_rows = None
+
+    try:
+        with futures.ThreadPoolExecutor(max_workers=parallel) as executor:
+            for stage in stages:
+                if written_rows is not None and None in durations.values():
+                    # a failed source may have written some of its data
+                    written_rows = None
+
+                pending = {
+                    executor.submit(_run_source, engine, conn_pool, s, written_rows): s
+                    for s in stage
+                }
+
+                for future in futures.as_completed(pending):
+                    s = pending[future]
+                    try:
+                        durations[s], source_written_rows = future.result()
+                        if written_rows is not None:
+                            written_rows.update(source_written_rows)
+                    except Exception:
+                        logger.exception('Failed to update %s', s)
+                        durations[s] = None
+    finally:
+        conn_pool.closeall()
+
+    logger.info('Update summary:')
+    for s in sources:
+        duration = durations[s]
+        if duration is None:
+            logger.info('%s: failed', s)
+        else:
+            logger.info('%s: %.1fs', s, duration)
 
-    with pg.get_connection() as conn:
-        for s in source:
-            if s in UPDATE_SOURCES:
-                UPDATE_SOURCES[s](engine, conn)
-            else:
-                logger.error('Passed nonexistent source to cli: %s', s)
+    if None in durations.values():
+        raise click.ClickException('Some of the sources failed to update')
 
 
 if __name__ == '__main__':
@@ -1,20 +1,28 @@
+import collections
+from concurrent import futures
 import copy
 import dataclasses
-import io
+import datetime as dt
 import logging
+from typing import Dict
+from typing import Iterator
 from typing import List
 from typing import Optional
 import zipfile
 
 import pandas as pd
 import psycopg2
-import requests
 import sqlalchemy
 
 from cloud_validol.loader.lib import cot
+from cloud_validol.loader.lib import download_cache
+from cloud_validol.loader.lib import load_state
 
 logger = logging.getLogger(__name__)
 
+MAX_CONCURRENT_DOWNLOADS = 8
+CSV_CHUNKSIZE = 100000
+
 
 @dataclasses.dataclass
 class CftcDownloadConfig:
@@ -160,63 +168,116 @@ def _make_derivative_configs() -> List[cot.DerivativeConfig]:
 def _download_doc(
     config: cot.DerivativeConfig,
     url: str,
-) -> Optional[pd.DataFrame]:
+    immutable: bool,
+) -> Optional[str]:
     logger.info('Downloading %s for %s', url, config.source)
 
-    response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
+    doc_path = download_cache.fetch(
+        url, headers={'User-Agent': 'Mozilla/5.0'}, immutable=immutable
+    )
 
-    if response.status_code == 404:
+    if doc_path is None:
         logger.error('%s is not found', url)
 
-        return None
+    return doc_path
 
-    with zipfile.ZipFile(io.BytesIO(response.content), 'r') as zip_file:
-        path = zip_file.namelist()[0]
-        csv_buff = zip_file.read(path).decode('utf-8')
 
-    return pd.read_csv(io.StringIO(csv_buff))
+def _read_doc(
+    config: cot.DerivativeConfig,
+    date_format: str,
+    doc_path: str,
+    chunksize: int,
+) -> Iterator[pd.DataFrame]:
+    with zipfile.ZipFile(doc_path, 'r') as zip_file:
+        with zip_file.open(zip_file.namelist()[0]) as csv_file:
+            for raw_df in pd.read_csv(
+                csv_file,
+                usecols=cot.get_usecols(config),
+                dtype=cot.get_dtypes(config),
+                chunksize=chunksize,
+            ):
+                yield cot.process_raw_dataframe(config, date_format, raw_df)
 
 
-def update(engine: sqlalchemy.engine.base.Engine, conn: psycopg2.extensions.connection):
+def update(
+    engine: sqlalchemy.engine.base.Engine,
+    conn: psycopg2.extensions.connection,
+    max_concurrent_downloads: int = MAX_CONCURRENT_DOWNLOADS,
+    chunksize: int = CSV_CHUNKSIZE,
+) -> Dict[str, int]:
     logger.info('Start updating CFTC data')
 
-    for config in _make_derivative_configs():
+    configs = _make_derivative_configs()
+
+    docs = []
+    for config in configs:
         update_interval = cot.get_interval(engine, config)
 
         if update_interval is None:
             continue
 
-        dfs = []
         if update_interval.load_initial:
-            raw_df = _download_doc(
-                config,
-                config.download_config.initial_download_url,
-            )
-
-            if raw_df is not None:
-                dfs.append(
-                    cot.process_raw_dataframe(
-                        config,
-                        config.download_config.initial_date_format
-                        or config.date_format,
-                        raw_df,
-                    )
+            docs.append(
+                (
+                    config,
+                    config.download_config.initial_download_url,
+                    config.download_config.initial_date_format or config.date_format,
+                    True,
                 )
+            )
 
         for year in update_interval.years_to_load:
-            raw_df = _download_doc(
-                config,
-                config.download_config.year_download_url.format(year=year),
+            docs.append(
+                (
+                    config,
+                    config.download_config.year_download_url.format(year=year),
+                    config.date_format,
+                    download_cache.is_settled(dt.date(year, 12, 31)),
+                )
             )
 
-            if raw_df is not None:
-                dfs.append(
-                    cot.process_raw_dataframe(config, config.date_format, raw_df)
+    written_rows: Dict[str, int] = collections.Counter()
+    config_written_rows: Dict[str, int] = collections.Counter()
+    last_event_dts: Dict[str, dt.date] = {}
+    with futures.ThreadPoolExecutor(max_workers=max_concurrent_downloads) as executor:
+        downloads = [
+            executor.submit(_download_doc, config, url, immutable)
+            for config, url, _, immutable in docs
+        ]
+
+        # documents are written one chunk at a time and in order,
+        # so that the latest platform names win
+        for download, (config, _, date_format, _) in zip(downloads, docs):
+            doc_path = download.result()
+            if doc_path is None:
+                continue
+
+            for df in _read_doc(config, date_format, doc_path, chunksize):
+                if df.empty:
+                    continue
+
+                last_event_dt = df.event_dttm.max().date()
+                last_event_dts[config.source] = max(
+                    last_event_dts.get(config.source, last_event_dt), last_event_dt
                 )
 
-        df = pd.concat(dfs)
+                cot.insert_platforms_derivatives(conn, config, df)
+                inserted_rows = cot.insert_data(conn, config, df, save_load_state=False)
+                written_rows[config.table_name] += inserted_rows
+                config_written_rows[config.source] += inserted_rows
 
-        cot.insert_platforms_derivatives(conn, config, df)
-        cot.insert_data(engine, config, df)
+    # the state is saved once all the documents are written, since they aren't
+    # ordered by date and an interrupted update has to be started over
+    for config in configs:
+        if config.source in last_event_dts:
+            load_state.update(
+                conn,
+                config.source,
+                last_event_dts[config.source],
+                config_written_rows[config.source],
+            )
+    conn.commit()
 
     logger.info('Finish updating CFTC data')
+
+    return written_rows
@@ -1,18 +1,29 @@
+import collections
 import copy
 import dataclasses
-import io
+import datetime as dt
 import logging
+from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Set
 
 import pandas as pd
 import psycopg2
-import requests
 import sqlalchemy
 
 from cloud_validol.loader.lib import cot
+from cloud_validol.loader.lib import download_cache
 
 logger = logging.getLogger(__name__)
 
+REPORT_TYPE_COL = 'FutOnly_or_Combined'
+# the reports misspell these columns
+COLUMN_RENAMES = {
+    'Swap__Positions_Short_All': 'Swap_Positions_Short_All',
+    'Swap__Positions_Spread_All': 'Swap_Positions_Spread_All',
+}
+
 
 @dataclasses.dataclass
 class IceDownloadConfig:
@@ -67,56 +78,97 @@ def _make_derivative_configs() -> List[cot.DerivativeConfig]:
     ]
 
 
-def _download_doc(
-    year: int,
-) -> pd.DataFrame:
+def _get_usecols(configs: List[cot.DerivativeConfig]) -> Set[str]:
+    usecols = {REPORT_TYPE_COL}
+    for config in configs:
+        usecols.update(cot.get_usecols(config))
+
+    return usecols
+
+
+def _download_doc(year: int) -> Optional[str]:
     logger.info('Downloading %s for ICE', year)
 
-    response = requests.get(
-        'https://www.theice.com/publicdocs/futures/COTHist{year}.csv'.format(year=year),
+    url = 'https://www.theice.com/publicdocs/futures/COTHist{year}.csv'.format(
+        year=year
+    )
+    doc_path = download_cache.fetch(
+        url,
         headers={'User-Agent': 'Mozilla/5.0'},
+        immutable=download_cache.is_settled(dt.date(year, 12, 31)),
     )
 
-    df = pd.read_csv(io.StringIO(response.text))
-    df = df.rename(
-        columns={
-            'Swap__Positions_Short_All': 'Swap_Positions_Short_All',
-            'Swap__Positions_Spread_All': 'Swap_Positions_Spread_All',
-        }
+    if doc_path is None:
+        logger.error('%s is not found', url)
+
+    return doc_path
+
+
+def _read_doc(configs: List[cot.DerivativeConfig], doc_path: str) -> pd.DataFrame:
+    usecols = _get_usecols(configs)
+    dtypes = {REPORT_TYPE_COL: 'str'}
+    for config in configs:
+        dtypes.update(cot.get_dtypes(config))
+    for column, renamed_column in COLUMN_RENAMES.items():
+        if renamed_column in dtypes:
+            dtypes[column] = dtypes[renamed_column]
+
+    df = pd.read_csv(
+        doc_path,
+        usecols=lambda column: COLUMN_RENAMES.get(column, column) in usecols,
+        dtype=dtypes,
+        na_values=['#VALUE!'],
     )
 
-    return df
+    return df.rename(columns=COLUMN_RENAMES)
 
 
-def update(engine: sqlalchemy.engine.base.Engine, conn: psycopg2.extensions.connection):
+def update(
+    engine: sqlalchemy.engine.base.Engine, conn: psycopg2.extensions.connection
+) -> Dict[str, int]:
     logger.info('Start updating ICE data')
 
     configs = _make_derivative_configs()
 
-    years_to_load = []
+    year_configs = collections.defaultdict(list)
     for config in configs:
         update_interval = cot.get_interval(engine, config)
 
         if update_interval is None:
             continue
 
-        years_to_load.extend(update_interval.years_to_load)
+        for year in update_interval.years_to_load:
+            year_configs[year].append(config)
 
-    overall_dfs = []
-    for year in set(years_to_load):
-        overall_dfs.append(_download_doc(year))
-
-    overall_df = pd.concat(overall_dfs)
-    overall_df = overall_df.replace('#VALUE!', None)
+    raw_dfs = collections.defaultdict(list)
+    for year, configs_to_load in sorted(year_configs.items()):
+        doc_path = _download_doc(year)
+        if doc_path is None:
+            continue
 
+        config_by_report_type = {
+            config.download_config.report_type_filter: config
+            for config in configs_to_load
+        }
+        for report_type, raw_df in _read_doc(configs, doc_path).groupby(
+            REPORT_TYPE_COL
+        ):
+            report_config = config_by_report_type.get(report_type)
+            if report_config is not None:
+                raw_dfs[report_config.source].append(raw_df)
+
+    written_rows: Dict[str, int] = collections.Counter()
     for config in configs:
-        raw_df = overall_df[
-            overall_df['FutOnly_or_Combined']
-            == config.download_config.report_type_filter
-        ]
-        df = cot.process_raw_dataframe(config, config.date_format, raw_df)
+        if not raw_dfs[config.source]:
+            continue
+
+        df = cot.process_raw_dataframe(
+            config, config.date_format, pd.concat(raw_dfs[config.source])
+        )
 
         cot.insert_platforms_derivatives(conn, config, df)
-        cot.insert_data(engine, config, df)
+        written_rows[config.table_name] += cot.insert_data(conn, config, df)
 
     logger.info('Finish updating ICE data')
+
+    return written_rows
@@ -1,23 +1,36 @@
+import asyncio
+import collections
+from concurrent import futures
 import datetime as dt
-import io
 import logging
-import time
+from typing import Dict
+from typing import List
 from typing import Optional
 from typing import Tuple
 
 import pandas as pd
 import psycopg2
 import pytz
-import requests
 import sqlalchemy
 import tqdm
 
+from cloud_validol.loader.lib import download_cache
 from cloud_validol.loader.lib import interval_utils
+from cloud_validol.loader.lib import load_state
 from cloud_validol.loader.lib import pg
+from cloud_validol.loader.lib import rate_limit
 
 logger = logging.getLogger(__name__)
 
 GLOBAL_FROM = dt.date(2012, 11, 1)
+LOAD_STATE_SOURCE = 'moex'
+DOWNLOAD_URL = 'https://www.moex.com/ru/derivatives/open-positions-csv.aspx'
+# (month, day) of public holidays the derivatives market is closed on every year
+HOLIDAYS = [(1, 1), (1, 2), (1, 7), (2, 23), (3, 8), (5, 1), (5, 9), (6, 12), (11, 4)]
+REQUESTS_PER_SECOND = 2.0
+MAX_IN_FLIGHT_REQUESTS = 4
+# downloaded days are written in date order, at least this many at once
+FLUSH_DAYS = 30
 CONTRACT_TYPE_MAPPING = {'F': 'Futures', 'C': 'Option call', 'P': 'Option put'}
 CSV_MAPPING = {
     'clients_in_long': 'lq',
@@ -32,89 +45,58 @@ def _dt_serializer(date: dt.date) -> str:
     return date.strftime('%Y%m%d')
 
 
-def _download_date(date: dt.date) -> Optional[pd.DataFrame]:
-    response = requests.get(
-        'https://www.moex.com/ru/derivatives/open-positions-csv.aspx',
-        params={'d': _dt_serializer(date)},
-        headers={'User-Agent': 'Mozilla/5.0'},
-    )
-
-    if response.status_code == 404:
-        logger.error('%s is not found', date)
-
-        return None
-
-    df = pd.read_csv(
-        io.StringIO(response.text),
-        parse_dates=['moment'],
-        date_parser=lambda x: dt.datetime.fromisoformat(x).replace(tzinfo=pytz.UTC),
-    )
+def _parse_doc(doc_path: str) -> Optional[pd.DataFrame]:
+    df = pd.read_csv(doc_path)
 
     if df.empty:
         return None
 
     df = df.rename(columns={'moment': 'event_dttm', 'isin': 'code'})
-
-    df.name = df.apply(
-        lambda row: '{} ({})'.format(
-            row['name'], CONTRACT_TYPE_MAPPING[row.contract_type]
-        ),
-        axis=1,
-    )
-    df.iz_fiz.fillna(0, inplace=True)
+    df['event_dttm'] = pd.to_datetime(df.event_dttm).dt.tz_localize(pytz.UTC)
+    df['name'] = df.name + ' (' + df.contract_type.map(CONTRACT_TYPE_MAPPING) + ')'
+    df['iz_fiz'] = df.iz_fiz.fillna(0).map(PHYS_MAPPING)
 
     keys = ['event_dttm', 'name']
 
-    return pd.DataFrame(
-        [
-            {
-                **{
-                    '{}{}'.format(PHYS_MAPPING[row.iz_fiz], value): row[key]
-                    for _, row in content.iterrows()
-                    for key, value in CSV_MAPPING.items()
-                },
-                **dict(zip(keys, group)),
-            }
-            for group, content in df.groupby(keys)
-        ]
+    result_df = (
+        df.drop_duplicates(keys + ['iz_fiz'], keep='last')
+        .set_index(keys + ['iz_fiz'])[list(CSV_MAPPING)]
+        .unstack('iz_fiz')
     )
+    result_df.columns = [
+        '{}{}'.format(phys, CSV_MAPPING[key]) for key, phys in result_df.columns
+    ]
 
+    return result_df.reset_index()
 
-def _get_interval(
-    engine: sqlalchemy.engine.base.Engine,
-) -> Optional[Tuple[dt.date, dt.date]]:
-    df = pd.read_sql(
-        '''
-        SELECT MAX(DATE(event_dttm)) AS last_event_dt
-        FROM validol_internal.moex_derivatives_data
-    ''',
-        engine,
-    )
 
-    last_event_dt = df.iloc[0].last_event_dt
+def _download_date(date: dt.date) -> Optional[pd.DataFrame]:
+    doc_path = download_cache.fetch(
+        DOWNLOAD_URL,
+        params={'d': _dt_serializer(date)},
+        headers={'User-Agent': 'Mozilla/5.0'},
+        immutable=download_cache.is_settled(date),
+    )
 
-    return interval_utils.get_interval('moex', last_event_dt, GLOBAL_FROM)
+    if doc_path is None:
+        logger.error('%s is not found', date)
 
+        return None
 
-def update(engine: sqlalchemy.engine.base.Engine, conn: psycopg2.extensions.connection):
-    logger.info('Start updating moex data')
+    return _parse_doc(doc_path)
 
-    interval = _get_interval(engine)
-    if interval is None:
-        return
 
-    from_date, to_date = interval
-    dfs = []
-    for date in tqdm.tqdm(pd.date_range(from_date, to_date)):
-        date_data = _download_date(date)
-        if date_data is not None:
-            dfs.append(_download_date(date))
+def _get_trading_dates(from_date: dt.date, to_date: dt.date) -> List[dt.date]:
+    holidays = [
+        dt.date(year, month, day)
+        for year in range(from_date.year, to_date.year + 1)
+        for month, day in HOLIDAYS
+    ]
 
-        time.sleep(2)
+    return list(pd.bdate_range(from_date, to_date, freq='C', holidays=holidays).date)
 
-    if not dfs:
-        return
 
+def _insert_data(conn: psycopg2.extensions.connection, dfs: List[pd.DataFrame]) -> int:
     result_df = pd.concat(dfs)
 
     unique_derivative_names = list(result_df.name.unique())
@@ -134,20 +116,90 @@ def update(engine: sqlalchemy.engine.base.Engine, conn: psycopg2.extensions.conn
             zip(unique_derivative_names, pg.extract_ids_from_cursor(cursor))
         )
 
-    conn.commit()
-
     result_df['series_id'] = [
         derivative_name_map_id[name] for name in result_df['name']
     ]
     del result_df['name']
 
-    result_df.to_sql(
-        'moex_derivatives_data',
-        engine,
-        schema='validol_internal',
-        index=False,
-        if_exists='append',
-        chunksize=10000,
+    inserted_rows = pg.copy_insert(conn, 'moex_derivatives_data', result_df)
+    load_state.update(
+        conn, LOAD_STATE_SOURCE, result_df.event_dttm.max().date(), inserted_rows
+    )
+    conn.commit()
+
+    return inserted_rows
+
+
+async def _download_dates(
+    conn: psycopg2.extensions.connection,
+    dates: List[dt.date],
+    requests_per_second: float,
+    max_in_flight_requests: int,
+) -> int:
+    loop = asyncio.get_running_loop()
+    bucket = rate_limit.TokenBucket(requests_per_second)
+    semaphore = asyncio.Semaphore(max_in_flight_requests)
+
+    with futures.ThreadPoolExecutor(max_workers=max_in_flight_requests) as executor:
+
+        async def download(date: dt.date) -> Tuple[dt.date, Optional[pd.DataFrame]]:
+            async with semaphore:
+                if not download_cache.is_cached(
+                    DOWNLOAD_URL, params={'d': _dt_serializer(date)}
+                ):
+                    await bucket.acquire()
+
+                return date, await loop.run_in_executor(executor, _download_date, date)
+
+        # tasks are started in date order, so that data is written as it arrives
+        tasks = [asyncio.ensure_future(download(date)) for date in dates]
+
+        not_ready_dates = collections.deque(dates)
+        ready_dates: Dict[dt.date, Optional[pd.DataFrame]] = {}
+        dfs = []
+        unflushed_days = 0
+        inserted_rows = 0
+        for download_future in tqdm.tqdm(asyncio.as_completed(tasks), total=len(tasks)):
+            date, date_data = await download_future
+            ready_dates[date] = date_data
+
+            # only a prefix of dates is written, so that the stored data
+            # has no gaps and an interrupted update resumes after it
+            while not_ready_dates and not_ready_dates[0] in ready_dates:
+                date_data = ready_dates.pop(not_ready_dates.popleft())
+                if date_data is not None:
+                    dfs.append(date_data)
+                unflushed_days += 1
+
+            if dfs and (unflushed_days >= FLUSH_DAYS or not not_ready_dates):
+                inserted_rows += _insert_data(conn, dfs)
+                dfs = []
+                unflushed_days = 0
+
+    return inserted_rows
+
+
+def update(
+    engine: sqlalchemy.engine.base.Engine,
+    conn: psycopg2.extensions.connection,
+    requests_per_second: float = REQUESTS_PER_SECOND,
+    max_in_flight_requests: int = MAX_IN_FLIGHT_REQUESTS,
+) -> Dict[str, int]:
+    logger.info('Start updating moex data')
+
+    interval = interval_utils.get_interval(engine, LOAD_STATE_SOURCE, GLOBAL_FROM)
+    if interval is None:
+        return {}
+
+    inserted_rows = asyncio.run(
+        _download_dates(
+            conn,
+            _get_trading_dates(*interval),
+            requests_per_second,
+            max_in_flight_requests,
+        )
     )
 
     logger.info('Finish updating moex data')
+
+    return {'moex_derivatives_data': inserted_rows}
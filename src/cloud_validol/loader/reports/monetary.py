@@ -1,31 +1,51 @@
 import datetime as dt
-import io
 import logging
+from typing import Dict
+from typing import Optional
 
 import numpy as np
 import pandas as pd
 import psycopg2
 import pytz
-import requests
 import sqlalchemy
 
+from cloud_validol.loader.lib import download_cache
+from cloud_validol.loader.lib import load_state
+from cloud_validol.loader.lib import pg
+
 logger = logging.getLogger(__name__)
 
+LOAD_STATE_SOURCE = 'monetary'
+# observations this far back from the last loaded one are downloaded again,
+# since FRED revises the recent points of the series
+REVISION_LOOKBACK = dt.timedelta(days=365)
+
+
+class GraphNotFound(Exception):
+    def __init__(self, graph_id):
+        super().__init__(f'FRED graph {graph_id} is not found')
+
+        self.graph_id = graph_id
 
-def update(engine: sqlalchemy.engine.base.Engine, conn: psycopg2.extensions.connection):
-    logger.info('Start updating stlouisfed data')
 
+def _download_graphs(from_date: Optional[dt.date]) -> pd.DataFrame:
     dfs = {}
     for graph_id, sensor in [('BOGMBASEW', 'MBase'), ('ASTDSL', 'TDebt')]:
-        response = requests.get(
-            url='https://fred.stlouisfed.org/graph/fredgraph.csv',
-            params={
-                'id': graph_id,
-            },
+        params = {'id': graph_id}
+        if from_date is not None:
+            params['cosd'] = from_date.isoformat()
+
+        doc_path = download_cache.fetch(
+            'https://fred.stlouisfed.org/graph/fredgraph.csv',
+            params=params,
             headers={'Host': 'fred.stlouisfed.org', 'User-Agent': 'Mozilla/5.0'},
         )
 
-        df = pd.read_csv(io.StringIO(response.text))
+        # the graphs are stored side by side, so none of them can be skipped
+        if doc_path is None:
+            raise GraphNotFound(graph_id)
+
+        df = pd.read_csv(doc_path)
         df = df.replace('.', np.nan).dropna()
         df['event_dttm'] = df['DATE'].map(
             lambda x: dt.datetime.fromisoformat(x).replace(tzinfo=pytz.UTC)
@@ -35,19 +55,57 @@ def update(engine: sqlalchemy.engine.base.Engine, conn: psycopg2.extensions.conn
 
         dfs[sensor] = df
 
-    df = pd.merge(dfs['MBase'], dfs['TDebt'], on='event_dttm', how='outer')
+    return pd.merge(dfs['MBase'], dfs['TDebt'], on='event_dttm', how='outer')
 
-    with conn.cursor() as cursor:
-        cursor.execute('TRUNCATE TABLE validol_internal.fredgraph_data')
-    conn.commit()
 
-    df.to_sql(
-        'fredgraph_data',
-        engine,
-        schema='validol_internal',
-        index=False,
-        if_exists='append',
-        chunksize=10000,
+def update(
+    engine: sqlalchemy.engine.base.Engine,
+    conn: psycopg2.extensions.connection,
+    full_reload: bool = False,
+) -> Dict[str, int]:
+    logger.info('Start updating stlouisfed data')
+
+    last_event_dt = load_state.get_last_event_dt(engine, LOAD_STATE_SOURCE)
+    full_reload = full_reload or last_event_dt is None
+
+    if full_reload:
+        logger.info('Reloading the whole stlouisfed history')
+
+    from_date = (
+        None
+        if full_reload or last_event_dt is None
+        else last_event_dt - REVISION_LOOKBACK
     )
+    df = _download_graphs(from_date)
+
+    written_rows = 0
+    if full_reload and not df.empty:
+        # the reload is merged into the table within a single transaction,
+        # so readers see either the previous history or the new one
+        with conn.cursor() as cursor:
+            cursor.execute(
+                '''
+                DELETE FROM validol_internal.fredgraph_data
+                WHERE NOT event_dttm = ANY(%s)
+            ''',
+                (df.event_dttm.tolist(),),
+            )
+            # the fredgraph_data trigger queues the deleted rows, which the next
+            # refresh of validol.fredgraph removes, so they count as written
+            written_rows += cursor.rowcount
+
+    if not df.empty:
+        written_rows += pg.copy_insert(
+            conn,
+            'fredgraph_data',
+            df,
+            on_conflict_do_update=['series_id', 'event_dttm'],
+        )
+        load_state.update(
+            conn, LOAD_STATE_SOURCE, df.event_dttm.max().date(), written_rows
+        )
+    conn.commit()
+
+    logger.info('Finish updating stlouisfed data, %s rows written', written_rows)
 
-    logger.info('Finish updating stlouisfed data')
+    return {'fredgraph_data': written_rows}
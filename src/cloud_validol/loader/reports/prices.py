@@ -1,3 +1,4 @@
+from concurrent import futures
 import datetime as dt
 import logging
 from typing import Dict
@@ -10,10 +11,18 @@ import sqlalchemy
 import tqdm
 
 from cloud_validol.loader.lib import interval_utils
+from cloud_validol.loader.lib import load_state
+from cloud_validol.loader.lib import pg
+from cloud_validol.loader.lib import retry
 
 logger = logging.getLogger(__name__)
 
 GLOBAL_FROM = dt.date(2010, 1, 1)
+LOAD_STATE_SOURCE = 'prices'
+# every currency cross is fetched from investing.com, so this caps requests to it
+MAX_CONCURRENT_REQUESTS = 4
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = 2.0
 
 
 def _dt_serializer(date: dt.date) -> str:
@@ -21,62 +30,91 @@ def _dt_serializer(date: dt.date) -> str:
 
 
 def _get_intervals(engine: sqlalchemy.engine.base.Engine) -> Dict[int, Dict[str, str]]:
-    df = pd.read_sql(
+    index_df = pd.read_sql(
         '''
-        SELECT 
-            index.series_id,
-            MIN(index.currency_cross) AS currency_cross,
-            MAX(DATE(event_dttm)) AS last_event_dt
-        FROM validol_interface.investing_prices_index AS index
-        LEFT JOIN validol_internal.investing_prices_data AS data 
-            ON data.series_id = index.series_id
-        GROUP BY index.series_id
+        SELECT series_id, currency_cross
+        FROM validol_interface.investing_prices_index
     ''',
         engine,
     )
+    currency_crosses = dict(zip(index_df.series_id, index_df.currency_cross))
 
-    result = {}
-    for _, row in df.iterrows():
-        interval = interval_utils.get_interval(
-            row.currency_cross, row.last_event_dt, GLOBAL_FROM
-        )
-        if interval is not None:
-            from_date, to_date = interval
-            result[row.series_id] = {
-                'currency_cross': row.currency_cross,
-                'from_date': _dt_serializer(from_date),
-                'to_date': _dt_serializer(to_date),
-            }
+    return {
+        series_id: {
+            'currency_cross': currency_crosses[series_id],
+            'from_date': _dt_serializer(from_date),
+            'to_date': _dt_serializer(to_date),
+        }
+        for series_id, (from_date, to_date) in interval_utils.get_series_intervals(
+            engine, LOAD_STATE_SOURCE, currency_crosses, GLOBAL_FROM
+        ).items()
+    }
 
-    return result
+
+def _download_series(series_id: int, interval: Dict[str, str]) -> pd.DataFrame:
+    df = retry.call_with_retries(
+        investpy.get_currency_cross_historical_data,
+        attempts=MAX_ATTEMPTS,
+        backoff=RETRY_BACKOFF,
+        # investpy raises these on bad HTTP statuses and unparsable responses
+        retry_on=(ConnectionError, RuntimeError),
+        **interval,
+    )
+    df.index = df.index.map(lambda x: x.replace(tzinfo=pytz.UTC))
+    del df['Currency']
+    df = df.rename(
+        columns={
+            'Open': 'open_price',
+            'High': 'high_price',
+            'Low': 'low_price',
+            'Close': 'close_price',
+        }
+    )
+    df['series_id'] = series_id
+
+    return df.rename_axis('event_dttm').reset_index()
 
 
-def update(engine: sqlalchemy.engine.base.Engine, conn: psycopg2.extensions.connection):
+def update(
+    engine: sqlalchemy.engine.base.Engine,
+    conn: psycopg2.extensions.connection,
+    max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+) -> Dict[str, int]:
     logger.info('Start updating prices')
 
     intervals = _get_intervals(engine)
 
-    for series_id, interval in tqdm.tqdm(intervals.items()):
-        df = investpy.get_currency_cross_historical_data(**interval)
-        df.index = df.index.map(lambda x: x.replace(tzinfo=pytz.UTC))
-        del df['Currency']
-        df = df.rename(
-            columns={
-                'Open': 'open_price',
-                'High': 'high_price',
-                'Low': 'low_price',
-                'Close': 'close_price',
-            }
-        )
-        df['series_id'] = series_id
-        df.to_sql(
-            'investing_prices_data',
-            engine,
-            schema='validol_internal',
-            index=True,
-            index_label='event_dttm',
-            if_exists='append',
-            chunksize=10000,
-        )
+    dfs = []
+    with futures.ThreadPoolExecutor(max_workers=max_concurrent_requests) as executor:
+        pending = {
+            executor.submit(_download_series, series_id, interval): interval
+            for series_id, interval in intervals.items()
+        }
+
+        for future in tqdm.tqdm(futures.as_completed(pending), total=len(pending)):
+            try:
+                dfs.append(future.result())
+            except Exception:
+                logger.exception(
+                    'Failed to download %s', pending[future]['currency_cross']
+                )
+
+    inserted_rows = 0
+    if dfs:
+        df = pd.concat(dfs)
+        inserted_rows = pg.copy_insert(conn, 'investing_prices_data', df)
+
+        series_df = df.groupby('series_id').event_dttm.agg(['max', 'size'])
+        for series_id, last_event_dttm, rows_written in series_df.itertuples():
+            load_state.update(
+                conn,
+                LOAD_STATE_SOURCE,
+                last_event_dttm.date(),
+                int(rows_written),
+                series_id=int(series_id),
+            )
+        conn.commit()
 
     logger.info('Finish updating prices')
+
+    return {'investing_prices_data': inserted_rows}
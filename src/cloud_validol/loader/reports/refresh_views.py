@@ -1,8 +1,17 @@
+import asyncio
 import logging
+import time
+from typing import Dict
+from typing import List
+from typing import Optional
 
+import asyncpg
 import psycopg2
 import sqlalchemy
 
+from cloud_validol.lib import datasets
+from cloud_validol.loader.lib import pg
+
 logger = logging.getLogger(__name__)
 
 VIEWS = [
@@ -13,16 +22,134 @@ VIEWS = [
     'validol.cot_disaggregated',
     'validol.cot_financial_futures',
 ]
+MAX_CONCURRENT_REFRESHES = 3
+# tables holding series visibility, which the views over these series depend on
+INFO_TABLES_VIEWS = {
+    'moex_derivatives_info': ['validol.moex_derivatives'],
+    'cot_derivatives_info': [
+        'validol.cot_futures_only',
+        'validol.cot_disaggregated',
+        'validol.cot_financial_futures',
+    ],
+}
 
 
-def update(engine: sqlalchemy.engine.base.Engine, conn: psycopg2.extensions.connection):
-    logger.info('Start refreshing materialized views')
+def get_affected_views(written_rows: Dict[str, int]) -> List[str]:
+    affected_views = set()
+    for table_name, rows in written_rows.items():
+        if rows > 0:
+            affected_views.update(INFO_TABLES_VIEWS.get(table_name, []))
+
+    # validol.<name> views are built over validol_internal.<name>_data tables
+    for dataset in datasets.SCHEMA:
+        if written_rows.get(f'{dataset["name"]}_data', 0) > 0:
+            affected_views.add(f'validol.{dataset["name"]}')
+
+    return [view for view in VIEWS if view in affected_views]
+
+
+async def _has_unique_index(conn: asyncpg.Connection, view: str) -> bool:
+    # REFRESH MATERIALIZED VIEW CONCURRENTLY needs a unique index on plain columns
+    return await conn.fetchval(
+        '''
+        SELECT EXISTS (
+            SELECT 1
+            FROM pg_catalog.pg_index
+            WHERE indrelid = $1::regclass
+                AND indisunique
+                AND indpred IS NULL
+                AND indexprs IS NULL
+        )
+    ''',
+        view,
+    )
+
+
+async def _is_serving_table(conn: asyncpg.Connection, view: str) -> bool:
+    return await conn.fetchval(
+        '''
+        SELECT relkind = 'r'
+        FROM pg_catalog.pg_class
+        WHERE oid = $1::regclass
+    ''',
+        view,
+    )
+
+
+async def _refresh_serving_table(conn: asyncpg.Connection, view: str) -> float:
+    _, name = view.split('.')
+
+    started_at = time.monotonic()
+    written_rows = await conn.fetchval(f'SELECT validol_internal.refresh_{name}()')
+    duration = time.monotonic() - started_at
+
+    logger.info(
+        'Successfully refreshed %s incrementally in %.1fs, %s rows written',
+        view,
+        duration,
+        written_rows,
+    )
+
+    return duration
+
 
-    for view in VIEWS:
-        with conn.cursor() as cursor:
-            cursor.execute(f'REFRESH MATERIALIZED VIEW {view}')
-        conn.commit()
+async def _refresh_view(
+    pool: asyncpg.pool.Pool, semaphore: asyncio.Semaphore, view: str
+) -> float:
+    async with semaphore, pool.acquire() as conn:
+        # tables generated by the serving_tables codegen target are maintained
+        # by their own functions instead of being recomputed
+        if await _is_serving_table(conn, view):
+            return await _refresh_serving_table(conn, view)
+
+        concurrently = await _has_unique_index(conn, view)
+
+        started_at = time.monotonic()
+        await conn.execute(
+            f'REFRESH MATERIALIZED VIEW {"CONCURRENTLY " if concurrently else ""}{view}'
+        )
+        duration = time.monotonic() - started_at
+
+    logger.info(
+        'Successfully refreshed %s%s in %.1fs',
+        view,
+        ' concurrently' if concurrently else '',
+        duration,
+    )
+
+    return duration
+
+
+async def refresh(
+    pool: asyncpg.pool.Pool,
+    views: List[str] = VIEWS,
+    max_concurrent_refreshes: int = MAX_CONCURRENT_REFRESHES,
+) -> Dict[str, float]:
+    semaphore = asyncio.Semaphore(max_concurrent_refreshes)
+
+    durations = await asyncio.gather(
+        *[_refresh_view(pool, semaphore, view) for view in views]
+    )
+
+    return dict(zip(views, durations))
+
+
+async def _refresh_with_new_pool(views: List[str]) -> Dict[str, float]:
+    async with pg.get_async_connection_pool(max_size=MAX_CONCURRENT_REFRESHES) as pool:
+        return await refresh(pool, views)
+
+
+def update(
+    engine: sqlalchemy.engine.base.Engine,
+    conn: psycopg2.extensions.connection,
+    written_rows: Optional[Dict[str, int]] = None,
+):
+    logger.info('Start refreshing materialized views')
 
-        logger.info(f'Successfully refreshed {view}')
+    views = VIEWS if written_rows is None else get_affected_views(written_rows)
+    if views:
+        asyncio.run(_refresh_with_new_pool(views))
+    else:
+        logger.info('No data has changed since the last refresh, skipping it')
 
     logger.info('Finish refreshing materialized views')
@@ -0,0 +1,23 @@
+BEGIN;
+
+-- unique indexes allow refreshing views concurrently, without blocking readers
+
+CREATE UNIQUE INDEX fredgraph_unique_index
+    ON validol.fredgraph (event_dttm);
+
+CREATE UNIQUE INDEX investing_prices_unique_index
+    ON validol.investing_prices (currency_cross, event_dttm);
+
+CREATE UNIQUE INDEX moex_derivatives_unique_index
+    ON validol.moex_derivatives (derivative_name, event_dttm);
+
+CREATE UNIQUE INDEX cot_futures_only_unique_index
+    ON validol.cot_futures_only (platform_source, platform_code, derivative_name, report_type, event_dttm);
+
+CREATE UNIQUE INDEX cot_disaggregated_unique_index
+    ON validol.cot_disaggregated (platform_source, platform_code, derivative_name, report_type, event_dttm);
+
+CREATE UNIQUE INDEX cot_financial_futures_unique_index
+    ON validol.cot_financial_futures (platform_source, platform_code, derivative_name, report_type, event_dttm);
+
+COMMIT;
@@ -0,0 +1,1147 @@
+BEGIN;
+
+-- materialized views are replaced with tables refreshed incrementally:
+-- validol_internal.refresh_<name>() upserts the data rows loaded since the last
+-- refresh and adds or removes only the series whose visibility has changed
+
+DROP MATERIALIZED VIEW validol.fredgraph;
+DROP MATERIALIZED VIEW validol.investing_prices;
+DROP MATERIALIZED VIEW validol.moex_derivatives;
+DROP MATERIALIZED VIEW validol.cot_futures_only;
+DROP MATERIALIZED VIEW validol.cot_disaggregated;
+DROP MATERIALIZED VIEW validol.cot_financial_futures;
+
+-- the largest data row id each table has been refreshed up to
+CREATE TABLE validol_internal.serving_watermark
+(
+    name         VARCHAR PRIMARY KEY,
+    last_data_id BIGINT      NOT NULL,
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- the following code is generated with `codegen/ffill/generate.py --target serving_tables`, don't edit it by hand!
+
+CREATE TABLE validol.fredgraph AS
+SELECT
+    data.event_dttm,
+    data.mbase,
+    data.tdebt
+FROM validol_interface.fredgraph_data AS data
+INNER JOIN validol_interface.fredgraph_index AS index
+    ON index.series_id = data.series_id
+WITH NO DATA;
+
+
+CREATE UNIQUE INDEX fredgraph_unique_index
+    ON validol.fredgraph (event_dttm);
+
+ALTER TABLE validol.fredgraph OWNER TO validol_internal;
+
+-- visible series validol.fredgraph currently holds
+CREATE TABLE validol_internal.fredgraph_serving_index AS
+SELECT
+    series_id
+FROM validol_interface.fredgraph_index
+WITH NO DATA;
+
+ALTER TABLE validol_internal.fredgraph_serving_index OWNER TO validol_internal;
+
+CREATE FUNCTION validol_internal.refresh_fredgraph() RETURNS BIGINT AS $$
+DECLARE
+    from_data_id BIGINT;
+    to_data_id BIGINT;
+    affected_rows BIGINT;
+    written_rows BIGINT := 0;
+BEGIN
+    -- waits for the loaders' transactions in flight, so that no data row below
+    -- the new watermark gets committed after it has been taken
+    LOCK TABLE validol_internal.fredgraph_data IN SHARE MODE;
+    LOCK TABLE validol_internal.fredgraph_serving_index IN EXCLUSIVE MODE;
+
+    SELECT COALESCE(MAX(watermark.last_data_id), 0) INTO from_data_id
+    FROM validol_internal.serving_watermark AS watermark
+    WHERE watermark.name = 'fredgraph';
+
+    SELECT COALESCE(MAX(data.id), 0) INTO to_data_id
+    FROM validol_internal.fredgraph_data AS data;
+
+    CREATE TEMP TABLE removed_index ON COMMIT DROP AS
+    SELECT *
+    FROM validol_internal.fredgraph_serving_index
+    EXCEPT
+    SELECT
+        series_id
+    FROM validol_interface.fredgraph_index
+    WHERE visible;
+
+    CREATE TEMP TABLE added_index ON COMMIT DROP AS
+    SELECT
+        series_id
+    FROM validol_interface.fredgraph_index
+    WHERE visible
+    EXCEPT
+    SELECT *
+    FROM validol_internal.fredgraph_serving_index;
+
+    -- series hidden or renamed since the last refresh
+    DELETE FROM validol.fredgraph AS serving
+    USING removed_index
+    WHERE TRUE;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    DELETE FROM validol_internal.fredgraph_serving_index AS serving_index
+    USING removed_index
+    WHERE serving_index.series_id = removed_index.series_id;
+
+    INSERT INTO validol_internal.fredgraph_serving_index
+    SELECT *
+    FROM added_index;
+
+    -- rows loaded since the last refresh for the series served already
+    INSERT INTO validol.fredgraph
+    SELECT
+        data.event_dttm,
+        data.mbase,
+        data.tdebt
+    FROM validol_interface.fredgraph_data AS data
+    INNER JOIN validol_internal.fredgraph_serving_index AS index
+        ON index.series_id = data.series_id
+    WHERE data.id > from_data_id
+        AND data.id <= to_data_id
+        AND NOT EXISTS (
+            SELECT 1
+            FROM added_index
+            WHERE added_index.series_id = data.series_id
+        )
+    ON CONFLICT (event_dttm) DO UPDATE SET
+        mbase = EXCLUDED.mbase,
+        tdebt = EXCLUDED.tdebt;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    -- the whole history of the series shown or renamed since the last refresh
+    INSERT INTO validol.fredgraph
+    SELECT
+        data.event_dttm,
+        data.mbase,
+        data.tdebt
+    FROM validol_interface.fredgraph_data AS data
+    INNER JOIN added_index AS index
+        ON index.series_id = data.series_id
+    WHERE data.id <= to_data_id;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    INSERT INTO validol_internal.serving_watermark (name, last_data_id)
+    VALUES ('fredgraph', to_data_id)
+    ON CONFLICT (name) DO UPDATE SET
+        last_data_id = EXCLUDED.last_data_id,
+        refreshed_at = NOW();
+
+    DROP TABLE removed_index, added_index;
+
+    RETURN written_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER FUNCTION validol_internal.refresh_fredgraph() OWNER TO validol_internal;
+
+CREATE TABLE validol.investing_prices AS
+SELECT
+    data.event_dttm,
+    index.currency_cross,
+    data.open_price,
+    data.high_price,
+    data.low_price,
+    data.close_price
+FROM validol_interface.investing_prices_data AS data
+INNER JOIN validol_interface.investing_prices_index AS index
+    ON index.series_id = data.series_id
+WITH NO DATA;
+
+CREATE INDEX investing_prices_catalogue_index
+    ON validol.investing_prices (currency_cross);
+
+CREATE UNIQUE INDEX investing_prices_unique_index
+    ON validol.investing_prices (currency_cross, event_dttm);
+
+ALTER TABLE validol.investing_prices OWNER TO validol_internal;
+
+-- visible series validol.investing_prices currently holds
+CREATE TABLE validol_internal.investing_prices_serving_index AS
+SELECT
+    series_id,
+    currency_cross
+FROM validol_interface.investing_prices_index
+WITH NO DATA;
+
+ALTER TABLE validol_internal.investing_prices_serving_index OWNER TO validol_internal;
+
+CREATE FUNCTION validol_internal.refresh_investing_prices() RETURNS BIGINT AS $$
+DECLARE
+    from_data_id BIGINT;
+    to_data_id BIGINT;
+    affected_rows BIGINT;
+    written_rows BIGINT := 0;
+BEGIN
+    -- waits for the loaders' transactions in flight, so that no data row below
+    -- the new watermark gets committed after it has been taken
+    LOCK TABLE validol_internal.investing_prices_data IN SHARE MODE;
+    LOCK TABLE validol_internal.investing_prices_serving_index IN EXCLUSIVE MODE;
+
+    SELECT COALESCE(MAX(watermark.last_data_id), 0) INTO from_data_id
+    FROM validol_internal.serving_watermark AS watermark
+    WHERE watermark.name = 'investing_prices';
+
+    SELECT COALESCE(MAX(data.id), 0) INTO to_data_id
+    FROM validol_internal.investing_prices_data AS data;
+
+    CREATE TEMP TABLE removed_index ON COMMIT DROP AS
+    SELECT *
+    FROM validol_internal.investing_prices_serving_index
+    EXCEPT
+    SELECT
+        series_id,
+        currency_cross
+    FROM validol_interface.investing_prices_index
+    WHERE visible;
+
+    CREATE TEMP TABLE added_index ON COMMIT DROP AS
+    SELECT
+        series_id,
+        currency_cross
+    FROM validol_interface.investing_prices_index
+    WHERE visible
+    EXCEPT
+    SELECT *
+    FROM validol_internal.investing_prices_serving_index;
+
+    -- series hidden or renamed since the last refresh
+    DELETE FROM validol.investing_prices AS serving
+    USING removed_index
+    WHERE serving.currency_cross = removed_index.currency_cross;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    DELETE FROM validol_internal.investing_prices_serving_index AS serving_index
+    USING removed_index
+    WHERE serving_index.series_id = removed_index.series_id;
+
+    INSERT INTO validol_internal.investing_prices_serving_index
+    SELECT *
+    FROM added_index;
+
+    -- rows loaded since the last refresh for the series served already
+    INSERT INTO validol.investing_prices
+    SELECT
+        data.event_dttm,
+        index.currency_cross,
+        data.open_price,
+        data.high_price,
+        data.low_price,
+        data.close_price
+    FROM validol_interface.investing_prices_data AS data
+    INNER JOIN validol_internal.investing_prices_serving_index AS index
+        ON index.series_id = data.series_id
+    WHERE data.id > from_data_id
+        AND data.id <= to_data_id
+        AND NOT EXISTS (
+            SELECT 1
+            FROM added_index
+            WHERE added_index.series_id = data.series_id
+        )
+    ON CONFLICT (currency_cross, event_dttm) DO UPDATE SET
+        open_price = EXCLUDED.open_price,
+        high_price = EXCLUDED.high_price,
+        low_price = EXCLUDED.low_price,
+        close_price = EXCLUDED.close_price;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    -- the whole history of the series shown or renamed since the last refresh
+    INSERT INTO validol.investing_prices
+    SELECT
+        data.event_dttm,
+        index.currency_cross,
+        data.open_price,
+        data.high_price,
+        data.low_price,
+        data.close_price
+    FROM validol_interface.investing_prices_data AS data
+    INNER JOIN added_index AS index
+        ON index.series_id = data.series_id
+    WHERE data.id <= to_data_id;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    INSERT INTO validol_internal.serving_watermark (name, last_data_id)
+    VALUES ('investing_prices', to_data_id)
+    ON CONFLICT (name) DO UPDATE SET
+        last_data_id = EXCLUDED.last_data_id,
+        refreshed_at = NOW();
+
+    DROP TABLE removed_index, added_index;
+
+    RETURN written_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER FUNCTION validol_internal.refresh_investing_prices() OWNER TO validol_internal;
+
+CREATE TABLE validol.moex_derivatives AS
+SELECT
+    data.event_dttm,
+    index.derivative_name,
+    data.fl,
+    data.fs,
+    data.ul,
+    data.us,
+    data.flq,
+    data.fsq,
+    data.ulq,
+    data.usq
+FROM validol_interface.moex_derivatives_data AS data
+INNER JOIN validol_interface.moex_derivatives_index AS index
+    ON index.series_id = data.series_id
+WITH NO DATA;
+
+CREATE INDEX moex_derivatives_catalogue_index
+    ON validol.moex_derivatives (derivative_name);
+
+CREATE UNIQUE INDEX moex_derivatives_unique_index
+    ON validol.moex_derivatives (derivative_name, event_dttm);
+
+ALTER TABLE validol.moex_derivatives OWNER TO validol_internal;
+
+-- visible series validol.moex_derivatives currently holds
+CREATE TABLE validol_internal.moex_derivatives_serving_index AS
+SELECT
+    series_id,
+    derivative_name
+FROM validol_interface.moex_derivatives_index
+WITH NO DATA;
+
+ALTER TABLE validol_internal.moex_derivatives_serving_index OWNER TO validol_internal;
+
+CREATE FUNCTION validol_internal.refresh_moex_derivatives() RETURNS BIGINT AS $$
+DECLARE
+    from_data_id BIGINT;
+    to_data_id BIGINT;
+    affected_rows BIGINT;
+    written_rows BIGINT := 0;
+BEGIN
+    -- waits for the loaders' transactions in flight, so that no data row below
+    -- the new watermark gets committed after it has been taken
+    LOCK TABLE validol_internal.moex_derivatives_data IN SHARE MODE;
+    LOCK TABLE validol_internal.moex_derivatives_serving_index IN EXCLUSIVE MODE;
+
+    SELECT COALESCE(MAX(watermark.last_data_id), 0) INTO from_data_id
+    FROM validol_internal.serving_watermark AS watermark
+    WHERE watermark.name = 'moex_derivatives';
+
+    SELECT COALESCE(MAX(data.id), 0) INTO to_data_id
+    FROM validol_internal.moex_derivatives_data AS data;
+
+    CREATE TEMP TABLE removed_index ON COMMIT DROP AS
+    SELECT *
+    FROM validol_internal.moex_derivatives_serving_index
+    EXCEPT
+    SELECT
+        series_id,
+        derivative_name
+    FROM validol_interface.moex_derivatives_index
+    WHERE visible;
+
+    CREATE TEMP TABLE added_index ON COMMIT DROP AS
+    SELECT
+        series_id,
+        derivative_name
+    FROM validol_interface.moex_derivatives_index
+    WHERE visible
+    EXCEPT
+    SELECT *
+    FROM validol_internal.moex_derivatives_serving_index;
+
+    -- series hidden or renamed since the last refresh
+    DELETE FROM validol.moex_derivatives AS serving
+    USING removed_index
+    WHERE serving.derivative_name = removed_index.derivative_name;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    DELETE FROM validol_internal.moex_derivatives_serving_index AS serving_index
+    USING removed_index
+    WHERE serving_index.series_id = removed_index.series_id;
+
+    INSERT INTO validol_internal.moex_derivatives_serving_index
+    SELECT *
+    FROM added_index;
+
+    -- rows loaded since the last refresh for the series served already
+    INSERT INTO validol.moex_derivatives
+    SELECT
+        data.event_dttm,
+        index.derivative_name,
+        data.fl,
+        data.fs,
+        data.ul,
+        data.us,
+        data.flq,
+        data.fsq,
+        data.ulq,
+        data.usq
+    FROM validol_interface.moex_derivatives_data AS data
+    INNER JOIN validol_internal.moex_derivatives_serving_index AS index
+        ON index.series_id = data.series_id
+    WHERE data.id > from_data_id
+        AND data.id <= to_data_id
+        AND NOT EXISTS (
+            SELECT 1
+            FROM added_index
+            WHERE added_index.series_id = data.series_id
+        )
+    ON CONFLICT (derivative_name, event_dttm) DO UPDATE SET
+        fl = EXCLUDED.fl,
+        fs = EXCLUDED.fs,
+        ul = EXCLUDED.ul,
+        us = EXCLUDED.us,
+        flq = EXCLUDED.flq,
+        fsq = EXCLUDED.fsq,
+        ulq = EXCLUDED.ulq,
+        usq = EXCLUDED.usq;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    -- the whole history of the series shown or renamed since the last refresh
+    INSERT INTO validol.moex_derivatives
+    SELECT
+        data.event_dttm,
+        index.derivative_name,
+        data.fl,
+        data.fs,
+        data.ul,
+        data.us,
+        data.flq,
+        data.fsq,
+        data.ulq,
+        data.usq
+    FROM validol_interface.moex_derivatives_data AS data
+    INNER JOIN added_index AS index
+        ON index.series_id = data.series_id
+    WHERE data.id <= to_data_id;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    INSERT INTO validol_internal.serving_watermark (name, last_data_id)
+    VALUES ('moex_derivatives', to_data_id)
+    ON CONFLICT (name) DO UPDATE SET
+        last_data_id = EXCLUDED.last_data_id,
+        refreshed_at = NOW();
+
+    DROP TABLE removed_index, added_index;
+
+    RETURN written_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER FUNCTION validol_internal.refresh_moex_derivatives() OWNER TO validol_internal;
+
+CREATE TABLE validol.cot_futures_only AS
+SELECT
+    data.event_dttm,
+    index.platform_source,
+    index.platform_code,
+    index.platform_name,
+    index.derivative_name,
+    index.report_type,
+    data.oi,
+    data.ncl,
+    data.ncs,
+    data.cl,
+    data.cs,
+    data.nrl,
+    data.nrs,
+    data.x_4l_percent,
+    data.x_4s_percent,
+    data.x_8l_percent,
+    data.x_8s_percent
+FROM validol_interface.cot_futures_only_data AS data
+INNER JOIN validol_interface.cot_derivatives_index AS index
+    ON index.series_id = data.series_id
+WITH NO DATA;
+
+CREATE INDEX cot_futures_only_catalogue_index
+    ON validol.cot_futures_only (platform_source, platform_code, derivative_name, report_type);
+
+CREATE UNIQUE INDEX cot_futures_only_unique_index
+    ON validol.cot_futures_only (platform_source, platform_code, derivative_name, report_type, event_dttm);
+
+ALTER TABLE validol.cot_futures_only OWNER TO validol_internal;
+
+-- visible series validol.cot_futures_only currently holds
+CREATE TABLE validol_internal.cot_futures_only_serving_index AS
+SELECT
+    series_id,
+    platform_source,
+    platform_code,
+    platform_name,
+    derivative_name,
+    report_type
+FROM validol_interface.cot_derivatives_index
+WITH NO DATA;
+
+ALTER TABLE validol_internal.cot_futures_only_serving_index OWNER TO validol_internal;
+
+CREATE FUNCTION validol_internal.refresh_cot_futures_only() RETURNS BIGINT AS $$
+DECLARE
+    from_data_id BIGINT;
+    to_data_id BIGINT;
+    affected_rows BIGINT;
+    written_rows BIGINT := 0;
+BEGIN
+    -- waits for the loaders' transactions in flight, so that no data row below
+    -- the new watermark gets committed after it has been taken
+    LOCK TABLE validol_internal.cot_futures_only_data IN SHARE MODE;
+    LOCK TABLE validol_internal.cot_futures_only_serving_index IN EXCLUSIVE MODE;
+
+    SELECT COALESCE(MAX(watermark.last_data_id), 0) INTO from_data_id
+    FROM validol_internal.serving_watermark AS watermark
+    WHERE watermark.name = 'cot_futures_only';
+
+    SELECT COALESCE(MAX(data.id), 0) INTO to_data_id
+    FROM validol_internal.cot_futures_only_data AS data;
+
+    CREATE TEMP TABLE removed_index ON COMMIT DROP AS
+    SELECT *
+    FROM validol_internal.cot_futures_only_serving_index
+    EXCEPT
+    SELECT
+        series_id,
+        platform_source,
+        platform_code,
+        platform_name,
+        derivative_name,
+        report_type
+    FROM validol_interface.cot_derivatives_index
+    WHERE visible;
+
+    CREATE TEMP TABLE added_index ON COMMIT DROP AS
+    SELECT
+        series_id,
+        platform_source,
+        platform_code,
+        platform_name,
+        derivative_name,
+        report_type
+    FROM validol_interface.cot_derivatives_index
+    WHERE visible
+    EXCEPT
+    SELECT *
+    FROM validol_internal.cot_futures_only_serving_index;
+
+    -- series hidden or renamed since the last refresh
+    DELETE FROM validol.cot_futures_only AS serving
+    USING removed_index
+    WHERE serving.platform_source = removed_index.platform_source
+        AND serving.platform_code = removed_index.platform_code
+        AND serving.derivative_name = removed_index.derivative_name
+        AND serving.report_type = removed_index.report_type;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    DELETE FROM validol_internal.cot_futures_only_serving_index AS serving_index
+    USING removed_index
+    WHERE serving_index.series_id = removed_index.series_id;
+
+    INSERT INTO validol_internal.cot_futures_only_serving_index
+    SELECT *
+    FROM added_index;
+
+    -- rows loaded since the last refresh for the series served already
+    INSERT INTO validol.cot_futures_only
+    SELECT
+        data.event_dttm,
+        index.platform_source,
+        index.platform_code,
+        index.platform_name,
+        index.derivative_name,
+        index.report_type,
+        data.oi,
+        data.ncl,
+        data.ncs,
+        data.cl,
+        data.cs,
+        data.nrl,
+        data.nrs,
+        data.x_4l_percent,
+        data.x_4s_percent,
+        data.x_8l_percent,
+        data.x_8s_percent
+    FROM validol_interface.cot_futures_only_data AS data
+    INNER JOIN validol_internal.cot_futures_only_serving_index AS index
+        ON index.series_id = data.series_id
+    WHERE data.id > from_data_id
+        AND data.id <= to_data_id
+        AND NOT EXISTS (
+            SELECT 1
+            FROM added_index
+            WHERE added_index.series_id = data.series_id
+        )
+    ON CONFLICT (platform_source, platform_code, derivative_name, report_type, event_dttm) DO UPDATE SET
+        platform_name = EXCLUDED.platform_name,
+        oi = EXCLUDED.oi,
+        ncl = EXCLUDED.ncl,
+        ncs = EXCLUDED.ncs,
+        cl = EXCLUDED.cl,
+        cs = EXCLUDED.cs,
+        nrl = EXCLUDED.nrl,
+        nrs = EXCLUDED.nrs,
+        x_4l_percent = EXCLUDED.x_4l_percent,
+        x_4s_percent = EXCLUDED.x_4s_percent,
+        x_8l_percent = EXCLUDED.x_8l_percent,
+        x_8s_percent = EXCLUDED.x_8s_percent;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    -- the whole history of the series shown or renamed since the last refresh
+    INSERT INTO validol.cot_futures_only
+    SELECT
+        data.event_dttm,
+        index.platform_source,
+        index.platform_code,
+        index.platform_name,
+        index.derivative_name,
+        index.report_type,
+        data.oi,
+        data.ncl,
+        data.ncs,
+        data.cl,
+        data.cs,
+        data.nrl,
+        data.nrs,
+        data.x_4l_percent,
+        data.x_4s_percent,
+        data.x_8l_percent,
+        data.x_8s_percent
+    FROM validol_interface.cot_futures_only_data AS data
+    INNER JOIN added_index AS index
+        ON index.series_id = data.series_id
+    WHERE data.id <= to_data_id;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    INSERT INTO validol_internal.serving_watermark (name, last_data_id)
+    VALUES ('cot_futures_only', to_data_id)
+    ON CONFLICT (name) DO UPDATE SET
+        last_data_id = EXCLUDED.last_data_id,
+        refreshed_at = NOW();
+
+    DROP TABLE removed_index, added_index;
+
+    RETURN written_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER FUNCTION validol_internal.refresh_cot_futures_only() OWNER TO validol_internal;
+
+CREATE TABLE validol.cot_disaggregated AS
+SELECT
+    data.event_dttm,
+    index.platform_source,
+    index.platform_code,
+    index.platform_name,
+    index.derivative_name,
+    index.report_type,
+    data.oi,
+    data.nrl,
+    data.nrs,
+    data.pmpl,
+    data.pmps,
+    data.sdpl,
+    data.sdps,
+    data.mmpl,
+    data.mmps,
+    data.orpl,
+    data.orps,
+    data.x_4gl_percent,
+    data.x_4gs_percent,
+    data.x_8gl_percent,
+    data.x_8gs_percent,
+    data.x_4l_percent,
+    data.x_4s_percent,
+    data.x_8l_percent,
+    data.x_8s_percent,
+    data.sdp_spr,
+    data.mmp_spr,
+    data.orp_spr,
+    data.cl,
+    data.cs,
+    data.ncl,
+    data.ncs
+FROM validol_interface.cot_disaggregated_data AS data
+INNER JOIN validol_interface.cot_derivatives_index AS index
+    ON index.series_id = data.series_id
+WITH NO DATA;
+
+CREATE INDEX cot_disaggregated_catalogue_index
+    ON validol.cot_disaggregated (platform_source, platform_code, derivative_name, report_type);
+
+CREATE UNIQUE INDEX cot_disaggregated_unique_index
+    ON validol.cot_disaggregated (platform_source, platform_code, derivative_name, report_type, event_dttm);
+
+ALTER TABLE validol.cot_disaggregated OWNER TO validol_internal;
+
+-- visible series validol.cot_disaggregated currently holds
+CREATE TABLE validol_internal.cot_disaggregated_serving_index AS
+SELECT
+    series_id,
+    platform_source,
+    platform_code,
+    platform_name,
+    derivative_name,
+    report_type
+FROM validol_interface.cot_derivatives_index
+WITH NO DATA;
+
+ALTER TABLE validol_internal.cot_disaggregated_serving_index OWNER TO validol_internal;
+
+CREATE FUNCTION validol_internal.refresh_cot_disaggregated() RETURNS BIGINT AS $$
+DECLARE
+    from_data_id BIGINT;
+    to_data_id BIGINT;
+    affected_rows BIGINT;
+    written_rows BIGINT := 0;
+BEGIN
+    -- waits for the loaders' transactions in flight, so that no data row below
+    -- the new watermark gets committed after it has been taken
+    LOCK TABLE validol_internal.cot_disaggregated_data IN SHARE MODE;
+    LOCK TABLE validol_internal.cot_disaggregated_serving_index IN EXCLUSIVE MODE;
+
+    SELECT COALESCE(MAX(watermark.last_data_id), 0) INTO from_data_id
+    FROM validol_internal.serving_watermark AS watermark
+    WHERE watermark.name = 'cot_disaggregated';
+
+    SELECT COALESCE(MAX(data.id), 0) INTO to_data_id
+    FROM validol_internal.cot_disaggregated_data AS data;
+
+    CREATE TEMP TABLE removed_index ON COMMIT DROP AS
+    SELECT *
+    FROM validol_internal.cot_disaggregated_serving_index
+    EXCEPT
+    SELECT
+        series_id,
+        platform_source,
+        platform_code,
+        platform_name,
+        derivative_name,
+        report_type
+    FROM validol_interface.cot_derivatives_index
+    WHERE visible;
+
+    CREATE TEMP TABLE added_index ON COMMIT DROP AS
+    SELECT
+        series_id,
+        platform_source,
+        platform_code,
+        platform_name,
+        derivative_name,
+        report_type
+    FROM validol_interface.cot_derivatives_index
+    WHERE visible
+    EXCEPT
+    SELECT *
+    FROM validol_internal.cot_disaggregated_serving_index;
+
+    -- series hidden or renamed since the last refresh
+    DELETE FROM validol.cot_disaggregated AS serving
+    USING removed_index
+    WHERE serving.platform_source = removed_index.platform_source
+        AND serving.platform_code = removed_index.platform_code
+        AND serving.derivative_name = removed_index.derivative_name
+        AND serving.report_type = removed_index.report_type;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    DELETE FROM validol_internal.cot_disaggregated_serving_index AS serving_index
+    USING removed_index
+    WHERE serving_index.series_id = removed_index.series_id;
+
+    INSERT INTO validol_internal.cot_disaggregated_serving_index
+    SELECT *
+    FROM added_index;
+
+    -- rows loaded since the last refresh for the series served already
+    INSERT INTO validol.cot_disaggregated
+    SELECT
+        data.event_dttm,
+        index.platform_source,
+        index.platform_code,
+        index.platform_name,
+        index.derivative_name,
+        index.report_type,
+        data.oi,
+        data.nrl,
+        data.nrs,
+        data.pmpl,
+        data.pmps,
+        data.sdpl,
+        data.sdps,
+        data.mmpl,
+        data.mmps,
+        data.orpl,
+        data.orps,
+        data.x_4gl_percent,
+        data.x_4gs_percent,
+        data.x_8gl_percent,
+        data.x_8gs_percent,
+        data.x_4l_percent,
+        data.x_4s_percent,
+        data.x_8l_percent,
+        data.x_8s_percent,
+        data.sdp_spr,
+        data.mmp_spr,
+        data.orp_spr,
+        data.cl,
+        data.cs,
+        data.ncl,
+        data.ncs
+    FROM validol_interface.cot_disaggregated_data AS data
+    INNER JOIN validol_internal.cot_disaggregated_serving_index AS index
+        ON index.series_id = data.series_id
+    WHERE data.id > from_data_id
+        AND data.id <= to_data_id
+        AND NOT EXISTS (
+            SELECT 1
+            FROM added_index
+            WHERE added_index.series_id = data.series_id
+        )
+    ON CONFLICT (platform_source, platform_code, derivative_name, report_type, event_dttm) DO UPDATE SET
+        platform_name = EXCLUDED.platform_name,
+        oi = EXCLUDED.oi,
+        nrl = EXCLUDED.nrl,
+        nrs = EXCLUDED.nrs,
+        pmpl = EXCLUDED.pmpl,
+        pmps = EXCLUDED.pmps,
+        sdpl = EXCLUDED.sdpl,
+        sdps = EXCLUDED.sdps,
+        mmpl = EXCLUDED.mmpl,
+        mmps = EXCLUDED.mmps,
+        orpl = EXCLUDED.orpl,
+        orps = EXCLUDED.orps,
+        x_4gl_percent = EXCLUDED.x_4gl_percent,
+        x_4gs_percent = EXCLUDED.x_4gs_percent,
+        x_8gl_percent = EXCLUDED.x_8gl_percent,
+        x_8gs_percent = EXCLUDED.x_8gs_percent,
+        x_4l_percent = EXCLUDED.x_4l_percent,
+        x_4s_percent = EXCLUDED.x_4s_percent,
+        x_8l_percent = EXCLUDED.x_8l_percent,
+        x_8s_percent = EXCLUDED.x_8s_percent,
+        sdp_spr = EXCLUDED.sdp_spr,
+        mmp_spr = EXCLUDED.mmp_spr,
+        orp_spr = EXCLUDED.orp_spr,
+        cl = EXCLUDED.cl,
+        cs = EXCLUDED.cs,
+        ncl = EXCLUDED.ncl,
+        ncs = EXCLUDED.ncs;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    -- the whole history of the series shown or renamed since the last refresh
+    INSERT INTO validol.cot_disaggregated
+    SELECT
+        data.event_dttm,
+        index.platform_source,
+        index.platform_code,
+        index.platform_name,
+        index.derivative_name,
+        index.report_type,
+        data.oi,
+        data.nrl,
+        data.nrs,
+        data.pmpl,
+        data.pmps,
+        data.sdpl,
+        data.sdps,
+        data.mmpl,
+        data.mmps,
+        data.orpl,
+        data.orps,
+        data.x_4gl_percent,
+        data.x_4gs_percent,
+        data.x_8gl_percent,
+        data.x_8gs_percent,
+        data.x_4l_percent,
+        data.x_4s_percent,
+        data.x_8l_percent,
+        data.x_8s_percent,
+        data.sdp_spr,
+        data.mmp_spr,
+        data.orp_spr,
+        data.cl,
+        data.cs,
+        data.ncl,
+        data.ncs
+    FROM validol_interface.cot_disaggregated_data AS data
+    INNER JOIN added_index AS index
+        ON index.series_id = data.series_id
+    WHERE data.id <= to_data_id;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    INSERT INTO validol_internal.serving_watermark (name, last_data_id)
+    VALUES ('cot_disaggregated', to_data_id)
+    ON CONFLICT (name) DO UPDATE SET
+        last_data_id = EXCLUDED.last_data_id,
+        refreshed_at = NOW();
+
+    DROP TABLE removed_index, added_index;
+
+    RETURN written_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER FUNCTION validol_internal.refresh_cot_disaggregated() OWNER TO validol_internal;
+
+CREATE TABLE validol.cot_financial_futures AS
+SELECT
+    data.event_dttm,
+    index.platform_source,
+    index.platform_code,
+    index.platform_name,
+    index.derivative_name,
+    index.report_type,
+    data.oi,
+    data.dipl,
+    data.dips,
+    data.dip_spr,
+    data.ampl,
+    data.amps,
+    data.amp_spr,
+    data.lmpl,
+    data.lmps,
+    data.lmp_spr,
+    data.orpl,
+    data.orps,
+    data.orp_spr,
+    data.nrl,
+    data.nrs
+FROM validol_interface.cot_financial_futures_data AS data
+INNER JOIN validol_interface.cot_derivatives_index AS index
+    ON index.series_id = data.series_id
+WITH NO DATA;
+
+CREATE INDEX cot_financial_futures_catalogue_index
+    ON validol.cot_financial_futures (platform_source, platform_code, derivative_name, report_type);
+
+CREATE UNIQUE INDEX cot_financial_futures_unique_index
+    ON validol.cot_financial_futures (platform_source, platform_code, derivative_name, report_type, event_dttm);
+
+ALTER TABLE validol.cot_financial_futures OWNER TO validol_internal;
+
+-- visible series validol.cot_financial_futures currently holds
+CREATE TABLE validol_internal.cot_financial_futures_serving_index AS
+SELECT
+    series_id,
+    platform_source,
+    platform_code,
+    platform_name,
+    derivative_name,
+    report_type
+FROM validol_interface.cot_derivatives_index
+WITH NO DATA;
+
+ALTER TABLE validol_internal.cot_financial_futures_serving_index OWNER TO validol_internal;
+
+CREATE FUNCTION validol_internal.refresh_cot_financial_futures() RETURNS BIGINT AS $$
+DECLARE
+    from_data_id BIGINT;
+    to_data_id BIGINT;
+    affected_rows BIGINT;
+    written_rows BIGINT := 0;
+BEGIN
+    -- waits for the loaders' transactions in flight, so that no data row below
+    -- the new watermark gets committed after it has been taken
+    LOCK TABLE validol_internal.cot_financial_futures_data IN SHARE MODE;
+    LOCK TABLE validol_internal.cot_financial_futures_serving_index IN EXCLUSIVE MODE;
+
+    SELECT COALESCE(MAX(watermark.last_data_id), 0) INTO from_data_id
+    FROM validol_internal.serving_watermark AS watermark
+    WHERE watermark.name = 'cot_financial_futures';
+
+    SELECT COALESCE(MAX(data.id), 0) INTO to_data_id
+    FROM validol_internal.cot_financial_futures_data AS data;
+
+    CREATE TEMP TABLE removed_index ON COMMIT DROP AS
+    SELECT *
+    FROM validol_internal.cot_financial_futures_serving_index
+    EXCEPT
+    SELECT
+        series_id,
+        platform_source,
+        platform_code,
+        platform_name,
+        derivative_name,
+        report_type
+    FROM validol_interface.cot_derivatives_index
+    WHERE visible;
+
+    CREATE TEMP TABLE added_index ON COMMIT DROP AS
+    SELECT
+        series_id,
+        platform_source,
+        platform_code,
+        platform_name,
+        derivative_name,
+        report_type
+    FROM validol_interface.cot_derivatives_index
+    WHERE visible
+    EXCEPT
+    SELECT *
+    FROM validol_internal.cot_financial_futures_serving_index;
+
+    -- series hidden or renamed since the last refresh
+    DELETE FROM validol.cot_financial_futures AS serving
+    USING removed_index
+    WHERE serving.platform_source = removed_index.platform_source
+        AND serving.platform_code = removed_index.platform_code
+        AND serving.derivative_name = removed_index.derivative_name
+        AND serving.report_type = removed_index.report_type;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    DELETE FROM validol_internal.cot_financial_futures_serving_index AS serving_index
+    USING removed_index
+    WHERE serving_index.series_id = removed_index.series_id;
+
+    INSERT INTO validol_internal.cot_financial_futures_serving_index
+    SELECT *
+    FROM added_index;
+
+    -- rows loaded since the last refresh for the series served already
+    INSERT INTO validol.cot_financial_futures
+    SELECT
+        data.event_dttm,
+        index.platform_source,
+        index.platform_code,
+        index.platform_name,
+        index.derivative_name,
+        index.report_type,
+        data.oi,
+        data.dipl,
+        data.dips,
+        data.dip_spr,
+        data.ampl,
+        data.amps,
+        data.amp_spr,
+        data.lmpl,
+        data.lmps,
+        data.lmp_spr,
+        data.orpl,
+        data.orps,
+        data.orp_spr,
+        data.nrl,
+        data.nrs
+    FROM validol_interface.cot_financial_futures_data AS data
+    INNER JOIN validol_internal.cot_financial_futures_serving_index AS index
+        ON index.series_id = data.series_id
+    WHERE data.id > from_data_id
+        AND data.id <= to_data_id
+        AND NOT EXISTS (
+            SELECT 1
+            FROM added_index
+            WHERE added_index.series_id = data.series_id
+        )
+    ON CONFLICT (platform_source, platform_code, derivative_name, report_type, event_dttm) DO UPDATE SET
+        platform_name = EXCLUDED.platform_name,
+        oi = EXCLUDED.oi,
+        dipl = EXCLUDED.dipl,
+        dips = EXCLUDED.dips,
+        dip_spr = EXCLUDED.dip_spr,
+        ampl = EXCLUDED.ampl,
+        amps = EXCLUDED.amps,
+        amp_spr = EXCLUDED.amp_spr,
+        lmpl = EXCLUDED.lmpl,
+        lmps = EXCLUDED.lmps,
+        lmp_spr = EXCLUDED.lmp_spr,
+        orpl = EXCLUDED.orpl,
+        orps = EXCLUDED.orps,
+        orp_spr = EXCLUDED.orp_spr,
+        nrl = EXCLUDED.nrl,
+        nrs = EXCLUDED.nrs;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    -- the whole history of the series shown or renamed since the last refresh
+    INSERT INTO validol.cot_financial_futures
+    SELECT
+        data.event_dttm,
+        index.platform_source,
+        index.platform_code,
+        index.platform_name,
+        index.derivative_name,
+        index.report_type,
+        data.oi,
+        data.dipl,
+        data.dips,
+        data.dip_spr,
+        data.ampl,
+        data.amps,
+        data.amp_spr,
+        data.lmpl,
+        data.lmps,
+        data.lmp_spr,
+        data.orpl,
+        data.orps,
+        data.orp_spr,
+        data.nrl,
+        data.nrs
+    FROM validol_interface.cot_financial_futures_data AS data
+    INNER JOIN added_index AS index
+        ON index.series_id = data.series_id
+    WHERE data.id <= to_data_id;
+
+    GET DIAGNOSTICS affected_rows = ROW_COUNT;
+    written_rows := written_rows + affected_rows;
+
+    INSERT INTO validol_internal.serving_watermark (name, last_data_id)
+    VALUES ('cot_financial_futures', to_data_id)
+    ON CONFLICT (name) DO UPDATE SET
+        last_data_id = EXCLUDED.last_data_id,
+        refreshed_at = NOW();
+
+    DROP TABLE removed_index, added_index;
+
+    RETURN written_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER FUNCTION validol_internal.refresh_cot_financial_futures() OWNER TO validol_internal;
+
+-- initial population
+
+SELECT validol_internal.refresh_fredgraph();
+SELECT validol_internal.refresh_investing_prices();
+SELECT validol_internal.refresh_moex_derivatives();
+SELECT validol_internal.refresh_cot_futures_only();
+SELECT validol_internal.refresh_cot_disaggregated();
+SELECT validol_internal.refresh_cot_financial_futures();
+
+COMMIT;
@@ -0,0 +1,536 @@
+BEGIN;
+
+-- the COT data tables are range-partitioned by year of event_dttm,
+-- their rows are moved over and the sequences of ids are kept
+
+ALTER TABLE validol_internal.cot_futures_only_data RENAME TO cot_futures_only_data_old;
+ALTER INDEX validol_internal.cot_futures_only_data_pkey RENAME TO cot_futures_only_data_old_pkey;
+ALTER INDEX validol_internal.cot_futures_only_data_series_id_event_dttm_key RENAME TO cot_futures_only_data_old_key;
+
+CREATE TABLE validol_internal.cot_futures_only_data
+(
+    id           BIGINT      NOT NULL DEFAULT nextval('validol_internal.cot_futures_only_data_id_seq'),
+    series_id    BIGINT      NOT NULL REFERENCES validol_internal.cot_derivatives_info (id) ON DELETE CASCADE,
+    event_dttm   TIMESTAMPTZ NOT NULL,
+    oi           DECIMAL,
+    ncl          DECIMAL,
+    ncs          DECIMAL,
+    cl           DECIMAL,
+    cs           DECIMAL,
+    nrl          DECIMAL,
+    nrs          DECIMAL,
+    x_4l_percent DECIMAL,
+    x_4s_percent DECIMAL,
+    x_8l_percent DECIMAL,
+    x_8s_percent DECIMAL,
+
+    PRIMARY KEY (id, event_dttm),
+    UNIQUE (series_id, event_dttm)
+) PARTITION BY RANGE (event_dttm);
+
+ALTER SEQUENCE validol_internal.cot_futures_only_data_id_seq OWNED BY validol_internal.cot_futures_only_data.id;
+
+-- generated with `codegen/ffill/generate.py --target partitions`
+
+CREATE TABLE validol_internal.cot_futures_only_data_1986 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('1986-01-01 00:00:00+00') TO ('1987-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_1987 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('1987-01-01 00:00:00+00') TO ('1988-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_1988 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('1988-01-01 00:00:00+00') TO ('1989-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_1989 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('1989-01-01 00:00:00+00') TO ('1990-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_1990 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('1990-01-01 00:00:00+00') TO ('1991-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_1991 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('1991-01-01 00:00:00+00') TO ('1992-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_1992 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('1992-01-01 00:00:00+00') TO ('1993-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_1993 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('1993-01-01 00:00:00+00') TO ('1994-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_1994 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('1994-01-01 00:00:00+00') TO ('1995-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_1995 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('1995-01-01 00:00:00+00') TO ('1996-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_1996 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('1996-01-01 00:00:00+00') TO ('1997-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_1997 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('1997-01-01 00:00:00+00') TO ('1998-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_1998 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('1998-01-01 00:00:00+00') TO ('1999-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_1999 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('1999-01-01 00:00:00+00') TO ('2000-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2000 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2000-01-01 00:00:00+00') TO ('2001-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2001 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2001-01-01 00:00:00+00') TO ('2002-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2002 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2002-01-01 00:00:00+00') TO ('2003-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2003 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2003-01-01 00:00:00+00') TO ('2004-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2004 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2004-01-01 00:00:00+00') TO ('2005-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2005 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2005-01-01 00:00:00+00') TO ('2006-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2006 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2006-01-01 00:00:00+00') TO ('2007-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2007 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2007-01-01 00:00:00+00') TO ('2008-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2008 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2008-01-01 00:00:00+00') TO ('2009-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2009 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2009-01-01 00:00:00+00') TO ('2010-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2010 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2010-01-01 00:00:00+00') TO ('2011-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2011 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2011-01-01 00:00:00+00') TO ('2012-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2012 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2012-01-01 00:00:00+00') TO ('2013-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2013 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2013-01-01 00:00:00+00') TO ('2014-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2014 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2014-01-01 00:00:00+00') TO ('2015-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2015 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2015-01-01 00:00:00+00') TO ('2016-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2016 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2016-01-01 00:00:00+00') TO ('2017-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2017 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2017-01-01 00:00:00+00') TO ('2018-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2018 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2018-01-01 00:00:00+00') TO ('2019-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2019 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2019-01-01 00:00:00+00') TO ('2020-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2020 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2020-01-01 00:00:00+00') TO ('2021-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2021 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2021-01-01 00:00:00+00') TO ('2022-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2022 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2022-01-01 00:00:00+00') TO ('2023-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2023 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2023-01-01 00:00:00+00') TO ('2024-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2024 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2024-01-01 00:00:00+00') TO ('2025-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2025 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2025-01-01 00:00:00+00') TO ('2026-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2026 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2026-01-01 00:00:00+00') TO ('2027-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2027 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2027-01-01 00:00:00+00') TO ('2028-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2028 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2028-01-01 00:00:00+00') TO ('2029-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2029 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2029-01-01 00:00:00+00') TO ('2030-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2030 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2030-01-01 00:00:00+00') TO ('2031-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2031 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2031-01-01 00:00:00+00') TO ('2032-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2032 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2032-01-01 00:00:00+00') TO ('2033-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2033 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2033-01-01 00:00:00+00') TO ('2034-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2034 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2034-01-01 00:00:00+00') TO ('2035-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2035 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2035-01-01 00:00:00+00') TO ('2036-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2036 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2036-01-01 00:00:00+00') TO ('2037-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2037 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2037-01-01 00:00:00+00') TO ('2038-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2038 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2038-01-01 00:00:00+00') TO ('2039-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2039 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2039-01-01 00:00:00+00') TO ('2040-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_futures_only_data_2040 PARTITION OF validol_internal.cot_futures_only_data
+    FOR VALUES FROM ('2040-01-01 00:00:00+00') TO ('2041-01-01 00:00:00+00');
+
+CREATE TABLE validol_internal.cot_futures_only_data_default PARTITION OF validol_internal.cot_futures_only_data
+    DEFAULT;
+
+INSERT INTO validol_internal.cot_futures_only_data
+SELECT *
+FROM validol_internal.cot_futures_only_data_old;
+
+CREATE OR REPLACE VIEW validol_interface.cot_futures_only_index AS
+SELECT DISTINCT ON (cot_derivatives_index.series_id) cot_derivatives_index.*
+FROM validol_interface.cot_derivatives_index AS cot_derivatives_index
+         INNER JOIN validol_internal.cot_futures_only_data AS data
+                    ON data.series_id = cot_derivatives_index.series_id;
+
+CREATE OR REPLACE VIEW validol_interface.cot_futures_only_data AS
+SELECT *
+FROM validol_internal.cot_futures_only_data;
+
+DROP TABLE validol_internal.cot_futures_only_data_old;
+
+ALTER TABLE validol_internal.cot_disaggregated_data RENAME TO cot_disaggregated_data_old;
+ALTER INDEX validol_internal.cot_disaggregated_data_pkey RENAME TO cot_disaggregated_data_old_pkey;
+ALTER INDEX validol_internal.cot_disaggregated_data_series_id_event_dttm_key RENAME TO cot_disaggregated_data_old_key;
+
+CREATE TABLE validol_internal.cot_disaggregated_data
+(
+    id            BIGINT      NOT NULL DEFAULT nextval('validol_internal.cot_disaggregated_data_id_seq'),
+    series_id     BIGINT      NOT NULL REFERENCES validol_internal.cot_derivatives_info (id) ON DELETE CASCADE,
+    event_dttm    TIMESTAMPTZ NOT NULL,
+    oi            DECIMAL,
+    nrl           DECIMAL,
+    nrs           DECIMAL,
+    pmpl          DECIMAL,
+    pmps          DECIMAL,
+    sdpl          DECIMAL,
+    sdps          DECIMAL,
+    mmpl          DECIMAL,
+    mmps          DECIMAL,
+    orpl          DECIMAL,
+    orps          DECIMAL,
+    x_4gl_percent DECIMAL,
+    x_4gs_percent DECIMAL,
+    x_8gl_percent DECIMAL,
+    x_8gs_percent DECIMAL,
+    x_4l_percent  DECIMAL,
+    x_4s_percent  DECIMAL,
+    x_8l_percent  DECIMAL,
+    x_8s_percent  DECIMAL,
+    sdp_spr       DECIMAL,
+    mmp_spr       DECIMAL,
+    orp_spr       DECIMAL,
+
+    PRIMARY KEY (id, event_dttm),
+    UNIQUE (series_id, event_dttm)
+) PARTITION BY RANGE (event_dttm);
+
+ALTER SEQUENCE validol_internal.cot_disaggregated_data_id_seq OWNED BY validol_internal.cot_disaggregated_data.id;
+
+-- generated with `codegen/ffill/generate.py --target partitions`
+
+CREATE TABLE validol_internal.cot_disaggregated_data_1986 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('1986-01-01 00:00:00+00') TO ('1987-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_1987 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('1987-01-01 00:00:00+00') TO ('1988-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_1988 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('1988-01-01 00:00:00+00') TO ('1989-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_1989 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('1989-01-01 00:00:00+00') TO ('1990-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_1990 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('1990-01-01 00:00:00+00') TO ('1991-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_1991 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('1991-01-01 00:00:00+00') TO ('1992-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_1992 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('1992-01-01 00:00:00+00') TO ('1993-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_1993 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('1993-01-01 00:00:00+00') TO ('1994-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_1994 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('1994-01-01 00:00:00+00') TO ('1995-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_1995 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('1995-01-01 00:00:00+00') TO ('1996-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_1996 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('1996-01-01 00:00:00+00') TO ('1997-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_1997 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('1997-01-01 00:00:00+00') TO ('1998-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_1998 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('1998-01-01 00:00:00+00') TO ('1999-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_1999 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('1999-01-01 00:00:00+00') TO ('2000-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2000 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2000-01-01 00:00:00+00') TO ('2001-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2001 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2001-01-01 00:00:00+00') TO ('2002-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2002 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2002-01-01 00:00:00+00') TO ('2003-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2003 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2003-01-01 00:00:00+00') TO ('2004-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2004 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2004-01-01 00:00:00+00') TO ('2005-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2005 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2005-01-01 00:00:00+00') TO ('2006-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2006 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2006-01-01 00:00:00+00') TO ('2007-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2007 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2007-01-01 00:00:00+00') TO ('2008-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2008 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2008-01-01 00:00:00+00') TO ('2009-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2009 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2009-01-01 00:00:00+00') TO ('2010-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2010 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2010-01-01 00:00:00+00') TO ('2011-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2011 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2011-01-01 00:00:00+00') TO ('2012-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2012 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2012-01-01 00:00:00+00') TO ('2013-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2013 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2013-01-01 00:00:00+00') TO ('2014-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2014 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2014-01-01 00:00:00+00') TO ('2015-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2015 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2015-01-01 00:00:00+00') TO ('2016-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2016 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2016-01-01 00:00:00+00') TO ('2017-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2017 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2017-01-01 00:00:00+00') TO ('2018-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2018 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2018-01-01 00:00:00+00') TO ('2019-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2019 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2019-01-01 00:00:00+00') TO ('2020-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2020 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2020-01-01 00:00:00+00') TO ('2021-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2021 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2021-01-01 00:00:00+00') TO ('2022-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2022 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2022-01-01 00:00:00+00') TO ('2023-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2023 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2023-01-01 00:00:00+00') TO ('2024-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2024 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2024-01-01 00:00:00+00') TO ('2025-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2025 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2025-01-01 00:00:00+00') TO ('2026-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2026 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2026-01-01 00:00:00+00') TO ('2027-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2027 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2027-01-01 00:00:00+00') TO ('2028-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2028 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2028-01-01 00:00:00+00') TO ('2029-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2029 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2029-01-01 00:00:00+00') TO ('2030-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2030 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2030-01-01 00:00:00+00') TO ('2031-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2031 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2031-01-01 00:00:00+00') TO ('2032-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2032 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2032-01-01 00:00:00+00') TO ('2033-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2033 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2033-01-01 00:00:00+00') TO ('2034-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2034 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2034-01-01 00:00:00+00') TO ('2035-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2035 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2035-01-01 00:00:00+00') TO ('2036-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2036 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2036-01-01 00:00:00+00') TO ('2037-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2037 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2037-01-01 00:00:00+00') TO ('2038-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2038 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2038-01-01 00:00:00+00') TO ('2039-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2039 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2039-01-01 00:00:00+00') TO ('2040-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_disaggregated_data_2040 PARTITION OF validol_internal.cot_disaggregated_data
+    FOR VALUES FROM ('2040-01-01 00:00:00+00') TO ('2041-01-01 00:00:00+00');
+
+CREATE TABLE validol_internal.cot_disaggregated_data_default PARTITION OF validol_internal.cot_disaggregated_data
+    DEFAULT;
+
+INSERT INTO validol_internal.cot_disaggregated_data
+SELECT *
+FROM validol_internal.cot_disaggregated_data_old;
+
+CREATE OR REPLACE VIEW validol_interface.cot_disaggregated_index AS
+SELECT DISTINCT ON (cot_derivatives_index.series_id) cot_derivatives_index.*
+FROM validol_interface.cot_derivatives_index AS cot_derivatives_index
+         INNER JOIN validol_internal.cot_disaggregated_data AS data
+                    ON data.series_id = cot_derivatives_index.series_id;
+
+CREATE OR REPLACE VIEW validol_interface.cot_disaggregated_data AS
+SELECT *,
+       pmpl + sdpl AS cl,
+       pmps + sdps AS cs,
+       mmpl + orpl AS ncl,
+       mmps + orps AS ncs
+FROM validol_internal.cot_disaggregated_data;
+
+DROP TABLE validol_internal.cot_disaggregated_data_old;
+
+ALTER TABLE validol_internal.cot_financial_futures_data RENAME TO cot_financial_futures_data_old;
+ALTER INDEX validol_internal.cot_financial_futures_data_pkey RENAME TO cot_financial_futures_data_old_pkey;
+ALTER INDEX validol_internal.cot_financial_futures_data_series_id_event_dttm_key RENAME TO cot_financial_futures_data_old_key;
+
+CREATE TABLE validol_internal.cot_financial_futures_data
+(
+    id         BIGINT      NOT NULL DEFAULT nextval('validol_internal.cot_financial_futures_data_id_seq'),
+    series_id  BIGINT      NOT NULL REFERENCES validol_internal.cot_derivatives_info (id) ON DELETE CASCADE,
+    event_dttm TIMESTAMPTZ NOT NULL,
+    oi         DECIMAL,
+    dipl       DECIMAL,
+    dips       DECIMAL,
+    dip_spr    DECIMAL,
+    ampl       DECIMAL,
+    amps       DECIMAL,
+    amp_spr    DECIMAL,
+    lmpl       DECIMAL,
+    lmps       DECIMAL,
+    lmp_spr    DECIMAL,
+    orpl       DECIMAL,
+    orps       DECIMAL,
+    orp_spr    DECIMAL,
+    nrl        DECIMAL,
+    nrs        DECIMAL,
+
+    PRIMARY KEY (id, event_dttm),
+    UNIQUE (series_id, event_dttm)
+) PARTITION BY RANGE (event_dttm);
+
+ALTER SEQUENCE validol_internal.cot_financial_futures_data_id_seq OWNED BY validol_internal.cot_financial_futures_data.id;
+
+-- generated with `codegen/ffill/generate.py --target partitions`
+
+CREATE TABLE validol_internal.cot_financial_futures_data_1986 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('1986-01-01 00:00:00+00') TO ('1987-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_1987 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('1987-01-01 00:00:00+00') TO ('1988-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_1988 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('1988-01-01 00:00:00+00') TO ('1989-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_1989 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('1989-01-01 00:00:00+00') TO ('1990-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_1990 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('1990-01-01 00:00:00+00') TO ('1991-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_1991 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('1991-01-01 00:00:00+00') TO ('1992-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_1992 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('1992-01-01 00:00:00+00') TO ('1993-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_1993 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('1993-01-01 00:00:00+00') TO ('1994-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_1994 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('1994-01-01 00:00:00+00') TO ('1995-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_1995 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('1995-01-01 00:00:00+00') TO ('1996-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_1996 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('1996-01-01 00:00:00+00') TO ('1997-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_1997 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('1997-01-01 00:00:00+00') TO ('1998-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_1998 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('1998-01-01 00:00:00+00') TO ('1999-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_1999 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('1999-01-01 00:00:00+00') TO ('2000-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2000 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2000-01-01 00:00:00+00') TO ('2001-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2001 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2001-01-01 00:00:00+00') TO ('2002-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2002 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2002-01-01 00:00:00+00') TO ('2003-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2003 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2003-01-01 00:00:00+00') TO ('2004-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2004 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2004-01-01 00:00:00+00') TO ('2005-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2005 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2005-01-01 00:00:00+00') TO ('2006-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2006 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2006-01-01 00:00:00+00') TO ('2007-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2007 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2007-01-01 00:00:00+00') TO ('2008-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2008 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2008-01-01 00:00:00+00') TO ('2009-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2009 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2009-01-01 00:00:00+00') TO ('2010-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2010 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2010-01-01 00:00:00+00') TO ('2011-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2011 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2011-01-01 00:00:00+00') TO ('2012-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2012 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2012-01-01 00:00:00+00') TO ('2013-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2013 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2013-01-01 00:00:00+00') TO ('2014-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2014 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2014-01-01 00:00:00+00') TO ('2015-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2015 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2015-01-01 00:00:00+00') TO ('2016-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2016 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2016-01-01 00:00:00+00') TO ('2017-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2017 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2017-01-01 00:00:00+00') TO ('2018-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2018 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2018-01-01 00:00:00+00') TO ('2019-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2019 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2019-01-01 00:00:00+00') TO ('2020-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2020 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2020-01-01 00:00:00+00') TO ('2021-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2021 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2021-01-01 00:00:00+00') TO ('2022-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2022 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2022-01-01 00:00:00+00') TO ('2023-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2023 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2023-01-01 00:00:00+00') TO ('2024-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2024 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2024-01-01 00:00:00+00') TO ('2025-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2025 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2025-01-01 00:00:00+00') TO ('2026-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2026 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2026-01-01 00:00:00+00') TO ('2027-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2027 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2027-01-01 00:00:00+00') TO ('2028-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2028 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2028-01-01 00:00:00+00') TO ('2029-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2029 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2029-01-01 00:00:00+00') TO ('2030-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2030 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2030-01-01 00:00:00+00') TO ('2031-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2031 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2031-01-01 00:00:00+00') TO ('2032-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2032 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2032-01-01 00:00:00+00') TO ('2033-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2033 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2033-01-01 00:00:00+00') TO ('2034-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2034 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2034-01-01 00:00:00+00') TO ('2035-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2035 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2035-01-01 00:00:00+00') TO ('2036-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2036 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2036-01-01 00:00:00+00') TO ('2037-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2037 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2037-01-01 00:00:00+00') TO ('2038-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2038 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2038-01-01 00:00:00+00') TO ('2039-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2039 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2039-01-01 00:00:00+00') TO ('2040-01-01 00:00:00+00');
+CREATE TABLE validol_internal.cot_financial_futures_data_2040 PARTITION OF validol_internal.cot_financial_futures_data
+    FOR VALUES FROM ('2040-01-01 00:00:00+00') TO ('2041-01-01 00:00:00+00');
+
+CREATE TABLE validol_internal.cot_financial_futures_data_default PARTITION OF validol_internal.cot_financial_futures_data
+    DEFAULT;
+
+INSERT INTO validol_internal.cot_financial_futures_data
+SELECT *
+FROM validol_internal.cot_financial_futures_data_old;
+
+CREATE OR REPLACE VIEW validol_interface.cot_financial_futures_index AS
+SELECT DISTINCT ON (cot_derivatives_index.series_id) cot_derivatives_index.*
+FROM validol_interface.cot_derivatives_index AS cot_derivatives_index
+         INNER JOIN validol_internal.cot_financial_futures_data AS data
+                    ON data.series_id = cot_derivatives_index.series_id;
+
+CREATE OR REPLACE VIEW validol_interface.cot_financial_futures_data AS
+SELECT *
+FROM validol_internal.cot_financial_futures_data;
+
+DROP TABLE validol_internal.cot_financial_futures_data_old;
+
+-- the state of the loaders, so that planning an update doesn't scan the data
+
+CREATE TABLE validol_internal.load_state
+(
+    source        VARCHAR     NOT NULL,
+    -- 0 stands for the whole source
+    series_id     BIGINT      NOT NULL DEFAULT 0,
+    last_event_dt DATE        NOT NULL,
+    last_run_at   TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    rows_written  BIGINT      NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (source, series_id)
+);
+
+INSERT INTO validol_internal.load_state (source, last_event_dt, rows_written)
+SELECT platform.source,
+       MAX(DATE(data.event_dttm)),
+       COUNT(*)
+FROM (
+         SELECT series_id, event_dttm
+         FROM validol_internal.cot_futures_only_data
+         UNION ALL
+         SELECT series_id, event_dttm
+         FROM validol_internal.cot_disaggregated_data
+         UNION ALL
+         SELECT series_id, event_dttm
+         FROM validol_internal.cot_financial_futures_data
+     ) AS data
+         INNER JOIN validol_internal.cot_derivatives_info AS info
+                    ON info.id = data.series_id
+         INNER JOIN validol_internal.cot_derivatives_platform AS platform
+                    ON platform.id = info.cot_derivatives_platform_id
+GROUP BY platform.source;
+
+COMMIT;
@@ -0,0 +1,27 @@
+BEGIN;
+
+-- the rest of the loaders keep their state in validol_internal.load_state as well
+
+INSERT INTO validol_internal.load_state (source, last_event_dt, rows_written)
+SELECT 'moex',
+       MAX(DATE(event_dttm)),
+       COUNT(*)
+FROM validol_internal.moex_derivatives_data
+HAVING COUNT(*) > 0;
+
+INSERT INTO validol_internal.load_state (source, series_id, last_event_dt, rows_written)
+SELECT 'prices',
+       series_id,
+       MAX(DATE(event_dttm)),
+       COUNT(*)
+FROM validol_internal.investing_prices_data
+GROUP BY series_id;
+
+INSERT INTO validol_internal.load_state (source, last_event_dt, rows_written)
+SELECT 'monetary',
+       MAX(DATE(event_dttm)),
+       COUNT(*)
+FROM validol_internal.fredgraph_data
+HAVING COUNT(*) > 0;
+
+COMMIT;
@@ -0,0 +1,19 @@
+BEGIN;
+
+-- admin backend workers cache the atoms and drop the cache on these notifications
+CREATE FUNCTION validol_internal.notify_atom_changed() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('validol_atom_changed', '');
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER FUNCTION validol_internal.notify_atom_changed() OWNER TO validol_internal;
+
+CREATE TRIGGER atom_changed
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON validol_internal.atom
+FOR EACH STATEMENT
+EXECUTE FUNCTION validol_internal.notify_atom_changed();
+
+COMMIT;